@@ -1,13 +1,31 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from db import init_db
+import config
+from cache import cache
+from db import shutdown_db, PoolTimeout, DatabaseBusy
+from dbwatch import DataVersionWatcher
+from repository import repo
 from routes import router
+from debug import router as debug_router
+from metrics import MetricsMiddleware, router as metrics_router
 from openapi import register_openapi
+from pubsub import bus, close_on_exit_signal
+from relay import relay
+from trending import trending
+from responses import FastJSONResponse
+from versions import versions
 
 
 def create_app():
-    app = FastAPI(docs_url=None, redoc_url=None, openapi_url="/openapi.json")
+    app = FastAPI(
+        docs_url=None,
+        redoc_url=None,
+        # /openapi.json 은 openapi.py 가 미리 인코딩한 바이트로 직접 응답한다
+        openapi_url=None,
+        default_response_class=FastJSONResponse,
+    )
 
     # CORS: 모든 출처 허용
     app.add_middleware(
@@ -16,12 +34,59 @@ def create_app():
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Search-Truncated", "ETag"],
     )
 
+    # 라우트별 요청 수/지연 시간 (가장 바깥에서 CORS 처리 시간까지 포함)
+    if config.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
     app.include_router(router)
+    if config.METRICS_ENABLED:
+        app.include_router(metrics_router)
+    if config.DEBUG_ENDPOINTS:
+        app.include_router(debug_router)
+
+    # 풀에서 연결을 얻지 못하거나 다른 프로세스의 쓰기 락이 풀리지 않으면 503
+    @app.exception_handler(PoolTimeout)
+    @app.exception_handler(DatabaseBusy)
+    async def pool_timeout_handler(request, exc):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": {"code": 503, "message": "Service unavailable"}},
+        )
+
+    # startup: 저장소 준비 (SQLite 백엔드는 여기서 init_db 실행)
+    app.add_event_handler("startup", repo.start)
+    app.add_event_handler("shutdown", repo.close)
+    app.add_event_handler("startup", close_on_exit_signal)
+    app.add_event_handler("shutdown", bus.close_all)
+    # 다중 워커: 다른 워커가 발행한 이벤트도 이 워커의 /api/stream 구독자에게 전달
+    if config.BACKEND == "sqlite" and config.EVENTS_RELAY:
+        app.add_event_handler("startup", relay.start)
+        app.add_event_handler("shutdown", relay.stop)
+    # 인기 순위: 시작 시 최근 게시물로 채우고 주기적으로 감쇠를 다시 계산
+    app.add_event_handler(
+        "startup", lambda: trending.start(repo.recent_engagement, repo.get_posts)
+    )
+    app.add_event_handler("shutdown", trending.stop)
+
+    # 다른 프로세스가 DB 를 바꾸면 이 프로세스의 읽기 캐시와 ETag 버전을 비운다.
+    # data_version 은 자기 커밋에도 바뀌어 태그 단위 무효화를 무력화하므로, 다른 프로세스가
+    # 같은 파일에 쓸 때만 켠다 (SNS_DB_WATCH, 런처는 워커가 2개 이상이면 자동으로 켬)
+    if config.BACKEND == "sqlite" and config.DB_WATCH:
+
+        def on_change():
+            cache.clear()
+            versions.clear()
+            trending.mark_stale()
 
-    # startup: init db
-    app.add_event_handler("startup", init_db)
+        # 샤딩하면 샤드 파일마다 감시한다
+        for pool in repo.pools:
+            watcher = DataVersionWatcher(pool.path, config.DB_WATCH_INTERVAL, on_change)
+            app.add_event_handler("startup", watcher.start)
+            app.add_event_handler("shutdown", watcher.stop)
+    app.add_event_handler("shutdown", shutdown_db)
 
     # register openapi routes and custom schema
     register_openapi(app)
@@ -0,0 +1,98 @@
+"""게시물 ID 생성 방식별 대량 삽입 처리량 비교.
+
+같은 스키마(migrations.py)의 빈 DB 두 개에 무작위 UUIDv4 와 시간순 ID(utils.new_id)로
+게시물을 배치 단위로 넣으면서, 구간마다 초당 삽입 행 수와 최종 파일 크기를 출력한다.
+테이블이 페이지 캐시보다 커질수록 무작위 키는 PK 인덱스 곳곳에 끼어들어 느려진다.
+FTS 색인 비용은 두 방식에 똑같이 더해지므로 기본은 FTS 트리거를 빼고 잰다(--fts 로 포함).
+
+    cd python
+    python -m bench.bench_ids --rows 1000000
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+import config
+from migrations import migrate
+from utils import iso_now, new_id
+
+GENERATORS = {
+    "uuid4": lambda: str(uuid.uuid4()),
+    "uuid7": new_id,
+}
+
+
+def open_db(path, fts):
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA journal_mode={config.DB_JOURNAL_MODE}")
+    conn.execute(f"PRAGMA synchronous={config.DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size=-{config.DB_CACHE_SIZE_KB}")
+    migrate(conn)
+    if not fts:
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='trigger' AND tbl_name='posts'"
+        ).fetchall():
+            conn.execute(f"DROP TRIGGER {name}")
+    return conn
+
+
+def run(name, path, args):
+    gen = GENERATORS[name]
+    conn = open_db(path, args.fts)
+    segments = []
+    done = last = 0
+    seg_start = time.perf_counter()
+    total_start = seg_start
+    while done < args.rows:
+        n = min(args.batch, args.rows - done)
+        conn.executemany(
+            "INSERT INTO posts (id,username,content,createdAt,likes,commentsCount) "
+            "VALUES (?,?,?,?,0,0)",
+            [(gen(), f"user{i % 1000}", f"post body {i}", iso_now()) for i in range(n)],
+        )
+        conn.commit()
+        done += n
+        if done % args.segment == 0 or done == args.rows:
+            now = time.perf_counter()
+            segments.append((done, (done - last) / (now - seg_start)))
+            seg_start, last = now, done
+    total = time.perf_counter() - total_start
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return segments, args.rows / total, os.path.getsize(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--segment", type=int, default=250_000)
+    parser.add_argument("--fts", action="store_true", help="FTS 트리거 포함")
+    args = parser.parse_args(argv)
+
+    work = tempfile.mkdtemp(prefix="sns-ids-")
+    results = {}
+    for name in GENERATORS:
+        results[name] = run(name, os.path.join(work, f"{name}.db"), args)
+        for path in os.listdir(work):
+            os.remove(os.path.join(work, path))
+    os.rmdir(work)
+
+    print(f"rows={args.rows} batch={args.batch} cache={config.DB_CACHE_SIZE_KB}KiB")
+    print(f"{'rows':>10}" + "".join(f"{name + ' rows/s':>16}" for name in results))
+    for i, (done, _) in enumerate(results["uuid4"][0]):
+        rates = "".join(f"{r[0][i][1]:>16.0f}" for r in results.values())
+        print(f"{done:>10}{rates}")
+    print(f"{'overall':>10}" + "".join(f"{r[1]:>16.0f}" for r in results.values()))
+    print(
+        f"{'file MiB':>10}"
+        + "".join(f"{r[2] / 2**20:>16.1f}" for r in results.values())
+    )
+
+
+if __name__ == "__main__":
+    main()
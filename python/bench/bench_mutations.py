@@ -0,0 +1,191 @@
+"""변경 API별 SQL 문 수와 지연 시간 마이크로 벤치마크.
+
+이전 구현(존재 확인 SELECT → 쓰기 → 재조회)과 현재 저장소 구현
+(RETURNING / rowcount 기반)을 같은 DB에서 번갈아 실행해 비교한다.
+FTS 트리거가 있으면 추적 콜백이 트리거 내부 문장("-- ...")과 트리거마다 되풀이되는
+최상위 문장까지 보고하므로, 기본은 FTS 트리거를 빼고 잰다(--fts 로 포함, 지연 시간 비교용).
+
+    cd python
+    python -m bench.bench_mutations --iterations 2000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+# 셸에 SNS_DB_PATH 가 남아 있어도 실제 DB 를 건드리지 않도록 항상 새 임시 DB
+os.environ["SNS_DB_PATH"] = os.path.join(
+    tempfile.mkdtemp(prefix="sns-bench-"), "bench.db"
+)
+
+import db  # noqa: E402
+from repository import repo, POST_COLUMNS, COMMENT_COLUMNS  # noqa: E402
+
+
+# 이전 구현의 SQL 순서를 그대로 재현
+def legacy_update_post(c, post_id, comment_id, i):
+    c.execute("SELECT id FROM posts WHERE id=?", (post_id,))
+    c.fetchone()
+    c.execute(
+        "UPDATE posts SET username=?, content=?, updatedAt=? WHERE id=?",
+        ("u", f"edit {i}", "now", post_id),
+    )
+    c.connection.commit()
+    c.execute(f"SELECT {POST_COLUMNS} FROM posts WHERE id=?", (post_id,))
+    c.fetchone()
+
+
+def legacy_update_comment(c, post_id, comment_id, i):
+    c.execute("SELECT id FROM comments WHERE id=? AND postId=?", (comment_id, post_id))
+    c.fetchone()
+    c.execute(
+        "UPDATE comments SET username=?, content=?, updatedAt=? WHERE id=? AND postId=?",
+        ("u", f"edit {i}", "now", comment_id, post_id),
+    )
+    c.connection.commit()
+    c.execute(
+        f"SELECT {COMMENT_COLUMNS} FROM comments WHERE id=? AND postId=?",
+        (comment_id, post_id),
+    )
+    c.fetchone()
+
+
+def legacy_like_unlike(c, post_id, comment_id, i):
+    user = f"bench-{i}"
+    c.execute("SELECT id FROM posts WHERE id=?", (post_id,))
+    c.fetchone()
+    c.execute("INSERT INTO likes (postId, username) VALUES (?,?)", (post_id, user))
+    c.execute("UPDATE posts SET likes = likes + 1 WHERE id=?", (post_id,))
+    c.execute("SELECT likes FROM posts WHERE id=?", (post_id,))
+    c.fetchone()
+    c.connection.commit()
+    c.execute("SELECT id FROM posts WHERE id=?", (post_id,))
+    c.fetchone()
+    c.execute(
+        "SELECT username FROM likes WHERE postId=? AND username=?", (post_id, user)
+    )
+    c.fetchone()
+    c.execute("DELETE FROM likes WHERE postId=? AND username=?", (post_id, user))
+    c.execute("UPDATE posts SET likes = likes - 1 WHERE id=?", (post_id,))
+    c.connection.commit()
+
+
+def legacy_comment_roundtrip(c, post_id, comment_id, i):
+    new_id = str(uuid.uuid4())
+    c.execute("SELECT id FROM posts WHERE id=?", (post_id,))
+    c.fetchone()
+    c.execute(
+        "INSERT INTO comments (id,postId,username,content,createdAt) VALUES (?,?,?,?,?)",
+        (new_id, post_id, "u", "c", "now"),
+    )
+    c.execute(
+        "UPDATE posts SET commentsCount = commentsCount + 1 WHERE id=?", (post_id,)
+    )
+    c.connection.commit()
+    c.execute("SELECT id FROM comments WHERE id=? AND postId=?", (new_id, post_id))
+    c.fetchone()
+    c.execute("DELETE FROM comments WHERE id=? AND postId=?", (new_id, post_id))
+    c.execute(
+        "UPDATE posts SET commentsCount = commentsCount - 1 WHERE id=?", (post_id,)
+    )
+    c.connection.commit()
+
+
+def current_update_post(post_id, comment_id, i):
+    repo.update_post(post_id, "u", f"edit {i}")
+
+
+def current_update_comment(post_id, comment_id, i):
+    repo.update_comment(post_id, comment_id, "u", f"edit {i}")
+
+
+def current_like_unlike(post_id, comment_id, i):
+    repo.like_post(post_id, f"bench-{i}")
+    repo.unlike_post(post_id, f"bench-{i}")
+
+
+def current_comment_roundtrip(post_id, comment_id, i):
+    comment = repo.create_comment(post_id, "u", "c")
+    repo.delete_comment(post_id, comment["id"])
+
+
+CASES = [
+    ("updatePost", legacy_update_post, current_update_post),
+    ("updateComment", legacy_update_comment, current_update_comment),
+    ("likePost+unlikePost", legacy_like_unlike, current_like_unlike),
+    (
+        "createComment+deleteComment",
+        legacy_comment_roundtrip,
+        current_comment_roundtrip,
+    ),
+]
+
+
+def drop_fts_triggers():
+    with db.pool.connection() as conn:
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='trigger' "
+            "AND tbl_name IN ('posts', 'comments')"
+        ).fetchall():
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.commit()
+
+
+def run(fn, iterations, post_id, comment_id, legacy):
+    statements = []
+    # 풀 크기가 1 이므로 이 연결에 건 추적 콜백이 모든 호출에 적용된다
+    with db.pool.connection() as conn:
+        conn.set_trace_callback(statements.append)
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        if legacy:
+            with db.pool.connection() as conn:
+                fn(conn.cursor(), post_id, comment_id, i)
+        else:
+            fn(post_id, comment_id, i)
+        timings.append((time.perf_counter() - start) * 1e6)
+    with db.pool.connection() as conn:
+        conn.set_trace_callback(None)
+    # BEGIN/COMMIT 과 트리거 내부 문장("-- ...")을 제외한 최상위 SQL 문 수
+    sql = [
+        s
+        for s in statements
+        if not s.startswith("--") and s.split()[0].upper() not in ("BEGIN", "COMMIT")
+    ]
+    return len(sql) / iterations, statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--fts", action="store_true", help="FTS 트리거 포함")
+    args = parser.parse_args(argv)
+
+    db.pool.max_size = 1
+    db.init_db()
+    if not args.fts:
+        drop_fts_triggers()
+    post = repo.create_post("bench", "post")
+    comment = repo.create_comment(post["id"], "bench", "comment")
+
+    print(
+        f"{'operation':<30}{'stmts before':>14}{'stmts after':>13}"
+        f"{'p50 before(us)':>16}{'p50 after(us)':>15}"
+    )
+    for name, legacy, current in CASES:
+        before = run(legacy, args.iterations, post["id"], comment["id"], True)
+        after = run(current, args.iterations, post["id"], comment["id"], False)
+        print(
+            f"{name:<30}{before[0]:>14.1f}{after[0]:>13.1f}"
+            f"{before[1]:>16.1f}{after[1]:>15.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
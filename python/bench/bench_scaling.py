@@ -0,0 +1,164 @@
+"""다중 워커 읽기 처리량 확장성 벤치마크.
+
+워커 수를 바꿔 가며 `python main.py --workers N` 서버를 띄우고, 여러 클라이언트
+프로세스에서 GET /api/posts/{postId} 와 GET /api/posts 를 보내 처리량과
+1 워커 대비 배율을 출력한다. 클라이언트가 병목이 되지 않도록 클라이언트
+프로세스 수는 최대 워커 수 이상으로 둔다. 기본은 읽기 캐시를 끄고 SQLite 읽기를 잰다.
+
+    cd python
+    python -m bench.bench_scaling --workers 1,2,4,8 --duration 10
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(HERE, "..", "main.py")
+
+
+def wait_ready(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url + "/api/posts?limit=1").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def seed(url, posts):
+    ids = []
+    with httpx.Client(base_url=url, timeout=60) as client:
+        for i in range(0, posts, 5000):
+            items = [
+                {"username": f"user{j % 100}", "content": f"post body {j}"}
+                for j in range(i, min(posts, i + 5000))
+            ]
+            r = client.post("/api/bulk/posts", json=items)
+            r.raise_for_status()
+            ids.extend(x["data"]["id"] for x in r.json())
+    return ids
+
+
+async def client_loop(url, ids, concurrency, duration):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                if random.random() < 0.8:
+                    path = f"/api/posts/{random.choice(ids)}"
+                else:
+                    path = "/api/posts?limit=20"
+                start = time.perf_counter()
+                try:
+                    r = await client.get(path)
+                    if r.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def client_process(args):
+    return asyncio.run(client_loop(*args))
+
+
+def measure(url, ids, clients, concurrency, duration):
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(
+            client_process, [(url, ids, concurrency, duration)] * clients
+        )
+    latencies = sorted(x for lat, _ in results for x in lat)
+    errors = sum(e for _, e in results)
+    n = len(latencies)
+    return {
+        "requests": n,
+        "errors": errors,
+        "throughput": n / duration,
+        "p50": latencies[n // 2] * 1000 if n else 0.0,
+        "p99": latencies[int(n * 0.99)] * 1000 if n else 0.0,
+    }
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    default_workers = ",".join(
+        str(n) for n in sorted({1, 2, 4, 8, 16, cpus}) if n <= cpus
+    )
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default=default_workers)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=0, help="클라이언트 프로세스 수")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache", action="store_true", help="읽기 캐시 사용")
+    args = parser.parse_args(argv)
+
+    workers = [int(n) for n in args.workers.split(",")]
+    clients = args.clients or max(workers)
+    url = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ)
+    env["SNS_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="sns-scale-"), "s.db")
+    env["SNS_DB_RESET"] = "0"
+    if not args.cache:
+        env["SNS_CACHE_SIZE"] = "0"
+    env.pop("SNS_WORKERS", None)
+
+    ids = None
+    rows = []
+    for n in workers:
+        server = subprocess.Popen(
+            [sys.executable, MAIN, "--workers", str(n), "--port", str(args.port)],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_ready(url)
+            if ids is None:
+                ids = seed(url, args.posts)
+            measure(url, ids, clients, args.concurrency, 1.0)  # 워밍업
+            rows.append(
+                (n, measure(url, ids, clients, args.concurrency, args.duration))
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+    base = rows[0][1]["throughput"] / rows[0][0]
+    print(f"cpus={cpus} clients={clients}x{args.concurrency} cache={args.cache}")
+    print(
+        f"{'workers':>8}{'req/s':>10}{'speedup':>9}{'eff':>7}"
+        f"{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}"
+    )
+    for n, r in rows:
+        speedup = r["throughput"] / base
+        print(
+            f"{n:>8}{r['throughput']:>10.0f}{speedup:>9.2f}{speedup / n:>7.0%}"
+            f"{r['p50']:>9.2f}{r['p99']:>9.2f}{r['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
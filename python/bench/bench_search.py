@@ -0,0 +1,93 @@
+"""전문 검색(GET /api/search) 지연 시간 벤치마크.
+
+게시물 N건(기본 200,000)과 게시물당 댓글을 무작위 단어 본문으로 넣은 뒤
+흔한 단어/드문 단어/두 단어 조합/접두어 검색의 첫 페이지와 깊은 페이지를
+저장소에서 직접 호출해 중앙값과 최댓값(ms)을 출력한다.
+
+    cd python
+    python -m bench.bench_search --posts 1000000 --comments-per-post 1
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# 셸에 SNS_DB_PATH 가 남아 있어도 실제 DB 를 건드리지 않도록 항상 새 임시 DB
+os.environ["SNS_DB_PATH"] = os.path.join(
+    tempfile.mkdtemp(prefix="sns-bench-"), "bench.db"
+)
+
+from repository import repo  # noqa: E402
+
+# 앞쪽 단어일수록 자주 나오도록(지프 분포 비슷하게) 가중치를 준다
+VOCAB = [f"word{i}" for i in range(5000)]
+WEIGHTS = [1 / (i + 1) for i in range(len(VOCAB))]
+
+
+def text():
+    return " ".join(random.choices(VOCAB, WEIGHTS, k=12))
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=200000)
+    parser.add_argument("--comments-per-post", type=int, default=1)
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    random.seed(1)
+    repo.start()
+    try:
+        start = time.perf_counter()
+        post_ids = []
+        for i in range(0, args.posts, args.batch):
+            n = min(args.batch, args.posts - i)
+            results = repo.bulk_create_posts([("bench", text()) for _ in range(n)])
+            ids = [r["data"]["id"] for r in results]
+            post_ids.extend(ids)
+            if args.comments_per_post:
+                repo.bulk_create_comments(
+                    [
+                        (post_id, "bench", text())
+                        for post_id in ids
+                        for _ in range(args.comments_per_post)
+                    ]
+                )
+        rows = args.posts * (1 + args.comments_per_post)
+        print(f"seeded {rows} rows in {time.perf_counter() - start:.1f}s")
+
+        queries = [
+            ("common word", "word0", "all", None),
+            ("rare word", "word4999", "all", None),
+            ("two words", "word1 word2", "all", None),
+            ("prefix", "word12", "all", None),
+            ("posts only", "word3", "posts", None),
+            ("page 10", "word5", "all", 9),
+        ]
+        print(f"{'query':<14}{'q':<14}{'hits':>6}{'median ms':>12}{'max ms':>10}")
+        for label, q, kind, pages in queries:
+            cursor = None
+            for _ in range(pages or 0):
+                cursor = repo.search(q, kind, 20, cursor)[1]
+            hits, _, _ = repo.search(q, kind, 20, cursor)
+            median, worst = timed(lambda: repo.search(q, kind, 20, cursor), args.repeat)
+            print(f"{label:<14}{q:<14}{len(hits):>6}{median:>12.2f}{worst:>10.2f}")
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
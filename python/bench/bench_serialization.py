@@ -0,0 +1,87 @@
+"""GET /api/posts 응답 직렬화 벤치마크.
+
+게시물 N건(기본 10,000)을 넣은 뒤
+  1) 기존 경로: jsonable_encoder + 표준 json (FastAPI 기본 JSONResponse)
+  2) 현재 경로: FastJSONResponse (orjson, 인코더 단계 없음)
+로 같은 목록을 인코딩한 시간과, 전체 타임라인 스트리밍(stream=1) 요청의
+종단 간 시간을 측정한다.
+
+    cd python
+    python -m bench.bench_serialization --posts 10000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# 셸에 SNS_DB_PATH 가 남아 있어도 실제 DB 를 건드리지 않도록 항상 새 임시 DB
+os.environ["SNS_DB_PATH"] = os.path.join(
+    tempfile.mkdtemp(prefix="sns-bench-"), "bench.db"
+)
+os.environ.setdefault("SNS_CACHE_SIZE", "0")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import create_app  # noqa: E402
+from repository import repo  # noqa: E402
+from responses import FastJSONResponse, orjson  # noqa: E402
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with TestClient(create_app()) as client:
+        items = [(f"user{i % 100}", f"post body {i} " * 4) for i in range(args.posts)]
+        for i in range(0, len(items), 5000):
+            repo.bulk_create_posts(items[i : i + 5000])
+
+        posts = []
+        cursor = None
+        while True:
+            page, cursor = repo.list_posts(1000, cursor)
+            posts.extend(page)
+            if not cursor:
+                break
+
+        legacy = best_of(
+            lambda: JSONResponse(jsonable_encoder(posts)).body, args.repeat
+        )
+        fast = best_of(lambda: FastJSONResponse(posts).body, args.repeat)
+        print(
+            f"encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}"
+        )
+        print(f"encode {len(posts)} posts, jsonable_encoder + json: {legacy:8.2f} ms")
+        print(f"encode {len(posts)} posts, FastJSONResponse:        {fast:8.2f} ms")
+        print(f"speedup: {legacy / fast:.1f}x")
+
+        stream = best_of(
+            lambda: client.get("/api/posts", params={"stream": 1}).content,
+            args.repeat,
+        )
+        page = best_of(
+            lambda: client.get("/api/posts", params={"limit": 100}).content,
+            args.repeat * 10,
+        )
+        print(f"GET /api/posts?stream=1 ({len(posts)} rows):       {stream:8.2f} ms")
+        print(f"GET /api/posts?limit=100:                 {page:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
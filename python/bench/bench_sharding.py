@@ -0,0 +1,98 @@
+"""샤드 수에 따른 쓰기 처리량 벤치마크.
+
+샤드 수마다 새 프로세스에서 임시 DB 로 저장소를 만들고, 여러 스레드가 동시에
+게시물 생성 / 댓글 생성 / 좋아요를 섞어 실행해 초당 쓰기 수와 busy 재시도로도
+실패한 호출 수를 출력한다. 쓰기 락 대기를 그대로 보기 위해 HTTP 계층 없이
+저장소 메서드를 직접 부른다(라우트와 같은 retry_busy 를 거친다).
+
+    cd python
+    python -m bench.bench_sharding --shards 1,2,4,8 --threads 16 --duration 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import json, os, random, threading, time
+from db import retry_busy, DatabaseBusy
+from repository import repo
+
+threads = int(os.environ["BENCH_THREADS"])
+duration = float(os.environ["BENCH_DURATION"])
+repo.start()
+seed = [repo.create_post("seed", "seed post")["id"] for _ in range(200)]
+done = [0] * threads
+failed = [0] * threads
+
+
+def worker(n):
+    deadline = time.perf_counter() + duration
+    i = 0
+    while time.perf_counter() < deadline:
+        i += 1
+        r = random.random()
+        try:
+            if r < 0.4:
+                retry_busy(repo.create_post, f"u{n}", f"body {n} {i}")
+            elif r < 0.8:
+                retry_busy(repo.create_comment, random.choice(seed), f"u{n}", "c")
+            else:
+                retry_busy(repo.like_post, random.choice(seed), f"u{n}-{i}")
+            done[n] += 1
+        except DatabaseBusy:
+            failed[n] += 1
+
+
+start = time.perf_counter()
+ts = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+for t in ts:
+    t.start()
+for t in ts:
+    t.join()
+elapsed = time.perf_counter() - start
+repo.close()
+print(json.dumps({"writes": sum(done), "failed": sum(failed), "seconds": elapsed}))
+"""
+
+
+def run(shards, args):
+    work = tempfile.mkdtemp(prefix="sns-shard-")
+    env = dict(os.environ)
+    env.update(
+        SNS_DB_PATH=os.path.join(work, "bench.db"),
+        SNS_DB_RESET="1",
+        SNS_DB_SHARDS=str(shards),
+        SNS_CACHE_SIZE="0",
+        BENCH_THREADS=str(args.threads),
+        BENCH_DURATION=str(args.duration),
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True
+    )
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", default="1,2,4,8")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    rows = [(n, run(n, args)) for n in (int(s) for s in args.shards.split(","))]
+    base = rows[0][1]["writes"] / rows[0][1]["seconds"]
+    print(f"cpus={os.cpu_count()} threads={args.threads}")
+    print(f"{'shards':>7}{'writes/s':>11}{'speedup':>9}{'failed':>8}")
+    for n, r in rows:
+        rate = r["writes"] / r["seconds"]
+        print(f"{n:>7}{rate:>11.0f}{rate / base:>9.2f}{r['failed']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""앱 시작 시간과 첫 문서 요청 지연 시간 측정.
+
+새 프로세스마다 (1) 앱 모듈 import, (2) startup 이벤트 완료, (3) 첫
+GET /openapi.json, (4) 첫 GET /openapi.yaml 까지 걸린 시간을 재고,
+OpenAPI JSON 캐시 파일이 없을 때(cold)와 있을 때(warm)를 비교한다.
+참고용으로 기존 방식(요청 중 PyYAML 순수 파이썬 로더로 파싱)의 비용도 함께 출력한다.
+
+    cd python
+    python -m bench.bench_startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+from main import app
+t1 = time.perf_counter()
+yaml_imported = "yaml" in sys.modules
+from fastapi.testclient import TestClient
+t1b = time.perf_counter()
+with TestClient(app) as client:
+    t2 = time.perf_counter()
+    client.get("/openapi.json").raise_for_status()
+    t3 = time.perf_counter()
+    client.get("/openapi.yaml").raise_for_status()
+    t4 = time.perf_counter()
+print(json.dumps({
+    "importMs": (t1 - t0) * 1000,
+    "startupMs": (t2 - t1b) * 1000,
+    "firstJsonMs": (t3 - t2) * 1000,
+    "firstYamlMs": (t4 - t3) * 1000,
+    "yamlImported": yaml_imported,
+}))
+"""
+
+LEGACY = r"""
+import json, time
+t0 = time.perf_counter()
+import yaml
+t1 = time.perf_counter()
+with open(os.path.join("..", "openapi.yaml"), encoding="utf-8") as f:
+    yaml.load(f, Loader=yaml.SafeLoader)
+t2 = time.perf_counter()
+print(json.dumps({"yamlImportMs": (t1 - t0) * 1000, "pureParseMs": (t2 - t1) * 1000}))
+"""
+
+
+def run(code, env):
+    out = subprocess.run(
+        [sys.executable, "-c", "import os\n" + code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    keys = [k for k in samples[0] if isinstance(samples[0][k], float)]
+    return {k: statistics.median(s[k] for s in samples) for k in keys}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    work = tempfile.mkdtemp(prefix="sns-startup-")
+    env = dict(os.environ)
+    env["SNS_DB_PATH"] = os.path.join(work, "bench.db")
+    env["SNS_OPENAPI_CACHE_DIR"] = os.path.join(work, "cache")
+    try:
+        cold = []
+        for _ in range(args.runs):
+            shutil.rmtree(env["SNS_OPENAPI_CACHE_DIR"], ignore_errors=True)
+            os.makedirs(env["SNS_OPENAPI_CACHE_DIR"])
+            cold.append(run(PROBE, env))
+        warm = [run(PROBE, env) for _ in range(args.runs)]
+        legacy = summarize([run(LEGACY, env) for _ in range(args.runs)])
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(f"median of {args.runs} runs (ms)")
+    print(f"{'':<8}{'import':>10}{'startup':>10}{'1st json':>10}{'1st yaml':>10}")
+    for label, samples in (("cold", cold), ("warm", warm)):
+        s = summarize(samples)
+        print(
+            f"{label:<8}{s['importMs']:>10.1f}{s['startupMs']:>10.1f}"
+            f"{s['firstJsonMs']:>10.1f}{s['firstYamlMs']:>10.1f}"
+        )
+    print(f"yaml imported at app import: {cold[0]['yamlImported']}")
+    print(
+        f"legacy per-process cost on first /openapi.json: import yaml "
+        f"{legacy['yamlImportMs']:.1f} + pure-Python parse {legacy['pureParseMs']:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
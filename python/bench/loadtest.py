@@ -0,0 +1,534 @@
+"""API 부하 테스트 / 벤치마크.
+
+openapi.yaml 의 operationId 를 키로 하는 읽기/쓰기 혼합 시나리오를 실행하고
+엔드포인트별 처리량과 p50/p95/p99 지연 시간을 보고한다.
+
+    cd python
+    # 프로세스 내 ASGI 앱 대상 (기본)
+    python -m bench.loadtest --posts 1000 --comments-per-post 10 --duration 10
+    # 로컬 uvicorn 대상
+    python -m bench.loadtest --url http://127.0.0.1:8000 --scenario write-heavy
+    # 결과 저장 후 기준선과 비교 (회귀 시 종료 코드 1)
+    python -m bench.loadtest --output result.json --baseline baseline.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from urllib.parse import urlparse
+
+import httpx
+import yaml
+
+OPENAPI_YAML = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "openapi.yaml")
+)
+
+# operationId -> 가중치
+SCENARIOS = {
+    "read-heavy": {
+        "listPosts": 30,
+        "search": 5,
+        "getPost": 30,
+        "listComments": 20,
+        "getComment": 5,
+        "createPost": 2,
+        "createComment": 4,
+        "likePost": 3,
+        "unlikePost": 1,
+    },
+    "mixed": {
+        "listPosts": 15,
+        "search": 5,
+        "getPost": 15,
+        "listComments": 10,
+        "getComment": 5,
+        "createPost": 10,
+        "updatePost": 5,
+        "deletePost": 2,
+        "createComment": 10,
+        "updateComment": 5,
+        "deleteComment": 3,
+        "likePost": 10,
+        "unlikePost": 5,
+    },
+    "write-heavy": {
+        "listPosts": 5,
+        "getPost": 5,
+        "createPost": 20,
+        "updatePost": 10,
+        "deletePost": 5,
+        "createComment": 20,
+        "updateComment": 5,
+        "deleteComment": 5,
+        "likePost": 20,
+        "unlikePost": 5,
+    },
+    "bulk": {
+        "listPosts": 10,
+        "bulkCreatePosts": 5,
+        "bulkCreateComments": 5,
+        "bulkLikePosts": 5,
+    },
+}
+
+BULK_BATCH = 100
+
+# request_for 가 요청을 만들 수 있는 operationId. --mix 는 시작할 때 이 목록으로 검사한다
+SUPPORTED_OPERATIONS = frozenset(
+    {
+        "listPosts",
+        "trendingPosts",
+        "search",
+        "createPost",
+        "getPost",
+        "updatePost",
+        "deletePost",
+        "listComments",
+        "createComment",
+        "getComment",
+        "updateComment",
+        "deleteComment",
+        "likePost",
+        "unlikePost",
+        "bulkCreatePosts",
+        "bulkCreateComments",
+        "bulkLikePosts",
+        "listUserPosts",
+        "listUserComments",
+        "listUserLikes",
+        "streamEvents",
+    }
+)
+
+# 끝나지 않는 응답: 연결해 첫 조각을 받을 때까지를 잰다. httpx 의 ASGI 전송은 응답이
+# 끝날 때까지 본문을 모으므로 프로세스 내 실행에서는 쓸 수 없다 (--url 필요)
+STREAMING_OPERATIONS = frozenset({"streamEvents"})
+
+# 대상이 없어 요청을 만들지 못한 일이 연속으로 이만큼 쌓이면 워커를 끝낸다
+# (예: --mix deleteComment=1 에서 지울 댓글이 다 떨어진 경우)
+MAX_IDLE_TRIES = 1000
+
+# 시드 본문과 검색어에 쓰는 단어
+VOCAB = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima "
+    "mike november oscar papa quebec romeo sierra tango uniform victor whiskey"
+).split()
+
+
+def sentence(n=6):
+    return " ".join(random.choices(VOCAB, k=n))
+
+
+def load_operations():
+    with open(OPENAPI_YAML, "r", encoding="utf-8") as f:
+        spec = yaml.safe_load(f)
+    base = urlparse(spec["servers"][0]["url"]).path.rstrip("/")
+    operations = {}
+    for path, item in spec["paths"].items():
+        for method, op in item.items():
+            if isinstance(op, dict) and "operationId" in op:
+                operations[op["operationId"]] = (method.upper(), base + path)
+    return operations
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class State:
+    # 시나리오가 참조할 수 있는 ID 모음. 삭제는 실행 중 만든 항목만 대상으로 해서
+    # 시드 데이터가 줄어들지 않도록 한다.
+
+    def __init__(self):
+        self.posts = []
+        self.comments = []
+        self.created_posts = []
+        self.created_comments = []
+        self.likes = []
+        # 시드 데이터의 작성자/댓글 작성자/좋아요한 사용자 (사용자별 목록용)
+        self.authors = []
+        self.commenters = []
+        self.fans = []
+        self.seq = 0
+
+    def username(self):
+        self.seq += 1
+        return f"load-{self.seq}"
+
+
+def request_for(op, state):
+    # (경로 파라미터, 쿼리, 본문, 성공 후 상태 갱신 함수) 를 만든다. 대상이 없으면 None
+    rnd = random.choice
+    if op == "listPosts":
+        return {}, {"limit": 20}, None, None
+    if op == "trendingPosts":
+        return {}, {"limit": 20}, None, None
+    if op == "streamEvents":
+        return {}, None, None, None
+    if op in ("listUserPosts", "listUserComments", "listUserLikes"):
+        users = {
+            "listUserPosts": state.authors,
+            "listUserComments": state.commenters,
+            "listUserLikes": state.fans,
+        }[op]
+        if not users:
+            return None
+        return {"username": rnd(users)}, {"limit": 20}, None, None
+    if op == "search":
+        return {}, {"q": " ".join(random.sample(VOCAB, 2)), "limit": 20}, None, None
+    if op == "createPost":
+        body = {"username": state.username(), "content": "load test post"}
+        return {}, None, body, lambda r: state.created_posts.append(r["id"])
+    if op in ("getPost", "updatePost", "listComments", "createComment", "likePost"):
+        if not state.posts:
+            return None
+        post_id = rnd(state.posts)
+        params = {"postId": post_id}
+        if op == "getPost":
+            return params, None, None, None
+        if op == "updatePost":
+            return params, None, {"username": "load", "content": "edited"}, None
+        if op == "listComments":
+            return params, {"limit": 20}, None, None
+        if op == "createComment":
+            body = {"username": state.username(), "content": "load test comment"}
+            return (
+                params,
+                None,
+                body,
+                lambda r: state.created_comments.append((post_id, r["id"])),
+            )
+        user = state.username()
+        return (
+            params,
+            None,
+            {"username": user},
+            lambda r: state.likes.append((post_id, user)),
+        )
+    if op == "deletePost":
+        if not state.created_posts:
+            return None
+        return {"postId": state.created_posts.pop()}, None, None, None
+    if op in ("getComment", "updateComment"):
+        if not state.comments:
+            return None
+        post_id, comment_id = rnd(state.comments)
+        params = {"postId": post_id, "commentId": comment_id}
+        body = (
+            {"username": "load", "content": "edited"} if op == "updateComment" else None
+        )
+        return params, None, body, None
+    if op == "deleteComment":
+        if not state.created_comments:
+            return None
+        post_id, comment_id = state.created_comments.pop()
+        return {"postId": post_id, "commentId": comment_id}, None, None, None
+    if op == "unlikePost":
+        if not state.likes:
+            return None
+        post_id, user = state.likes.pop(random.randrange(len(state.likes)))
+        return {"postId": post_id}, None, {"username": user}, None
+    if op == "bulkCreatePosts":
+        body = [
+            {"username": state.username(), "content": "load test post"}
+            for _ in range(BULK_BATCH)
+        ]
+        return {}, None, body, None
+    if op in ("bulkCreateComments", "bulkLikePosts"):
+        if not state.posts:
+            return None
+        body = [
+            {"postId": rnd(state.posts), "username": state.username()}
+            for _ in range(BULK_BATCH)
+        ]
+        if op == "bulkCreateComments":
+            for item in body:
+                item["content"] = "load test comment"
+        return {}, None, body, None
+    raise ValueError(f"no request builder for operationId {op}")
+
+
+async def seed(client, state, posts, comments_per_post, likes_per_post, batch):
+    start = time.perf_counter()
+    for i in range(0, posts, batch):
+        items = [
+            {"username": f"seed{j % 100}", "content": f"seed post {j} {sentence()}"}
+            for j in range(i, min(posts, i + batch))
+        ]
+        r = await client.post("/api/bulk/posts", json=items)
+        r.raise_for_status()
+        state.posts.extend(x["data"]["id"] for x in r.json())
+    state.authors = [f"seed{j}" for j in range(min(posts, 100))]
+    state.commenters = [f"seed{n}" for n in range(comments_per_post)]
+    state.fans = [f"fan{n}" for n in range(likes_per_post)]
+    pending = [(p, n) for p in state.posts for n in range(comments_per_post)]
+    for i in range(0, len(pending), batch):
+        items = [
+            {
+                "postId": p,
+                "username": f"seed{n}",
+                "content": f"seed comment {n} {sentence()}",
+            }
+            for p, n in pending[i : i + batch]
+        ]
+        r = await client.post("/api/bulk/comments", json=items)
+        r.raise_for_status()
+        state.comments.extend((x["data"]["postId"], x["data"]["id"]) for x in r.json())
+    pending = [(p, n) for p in state.posts for n in range(likes_per_post)]
+    for i in range(0, len(pending), batch):
+        items = [
+            {"postId": p, "username": f"fan{n}"} for p, n in pending[i : i + batch]
+        ]
+        r = await client.post("/api/bulk/likes", json=items)
+        r.raise_for_status()
+    return time.perf_counter() - start
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+async def run_load(client, operations, mix, state, concurrency, duration, requests):
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    samples = {n: [] for n in names}
+    errors = {n: 0 for n in names}
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        nonlocal issued
+        idle = 0
+        while True:
+            if requests and issued >= requests:
+                return
+            if deadline and time.perf_counter() >= deadline:
+                return
+            op = random.choices(names, weights)[0]
+            built = request_for(op, state)
+            if built is None:
+                # 다른 워커가 대상을 만들 수 있도록 이벤트 루프에 양보한다
+                idle += 1
+                if idle >= MAX_IDLE_TRIES:
+                    return
+                await asyncio.sleep(0)
+                continue
+            idle = 0
+            issued += 1
+            path_params, query, body, on_success = built
+            method, template = operations[op]
+            url = template.format(**path_params)
+            start = time.perf_counter()
+            try:
+                if op in STREAMING_OPERATIONS:
+                    async with client.stream(method, url, params=query) as r:
+                        ok = r.status_code < 400
+                        async for _ in r.aiter_raw():
+                            break
+                else:
+                    r = await client.request(method, url, params=query, json=body)
+                    ok = r.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            samples[op].append((time.perf_counter() - start) * 1000)
+            if not ok:
+                errors[op] += 1
+            elif on_success is not None:
+                on_success(r.json())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    report = {}
+    for op in names:
+        values = sorted(samples[op])
+        if not values:
+            continue
+        report[op] = {
+            "requests": len(values),
+            "errors": errors[op],
+            "throughput": len(values) / elapsed,
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+        }
+    total = sum(len(v) for v in samples.values())
+    return elapsed, total, report
+
+
+def compare(result, baseline, threshold):
+    # 처리량이 threshold 비율 이상 줄거나 p95 가 그만큼 늘면 회귀로 본다
+    regressions = []
+    for op, cur in result["operations"].items():
+        base = baseline.get("operations", {}).get(op)
+        if not base:
+            continue
+        if base["throughput"] and cur["throughput"] < base["throughput"] * (
+            1 - threshold
+        ):
+            regressions.append(
+                f"{op}: throughput {cur['throughput']:.1f}/s < baseline {base['throughput']:.1f}/s"
+            )
+        if base["p95"] and cur["p95"] > base["p95"] * (1 + threshold):
+            regressions.append(
+                f"{op}: p95 {cur['p95']:.2f}ms > baseline {base['p95']:.2f}ms"
+            )
+    return regressions
+
+
+def print_report(result):
+    print(
+        f"scenario={result['scenario']} concurrency={result['concurrency']} "
+        f"elapsed={result['elapsed']:.1f}s total={result['requests']} "
+        f"({result['throughput']:.0f} req/s)"
+    )
+    print(
+        f"{'operationId':<20}{'reqs':>8}{'errors':>8}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    for op, r in sorted(result["operations"].items()):
+        print(
+            f"{op:<20}{r['requests']:>8}{r['errors']:>8}{r['throughput']:>10.1f}"
+            f"{r['p50']:>10.2f}{r['p95']:>10.2f}{r['p99']:>10.2f}"
+        )
+
+
+async def main_async(args):
+    operations = load_operations()
+    mix = parse_mix(args.mix) if args.mix else SCENARIOS[args.scenario]
+    unknown = [op for op in mix if op not in operations]
+    if unknown:
+        raise SystemExit(f"unknown operationId(s): {', '.join(unknown)}")
+    unsupported = [op for op in mix if op not in SUPPORTED_OPERATIONS]
+    if unsupported:
+        raise SystemExit(
+            f"no request builder for operationId(s): {', '.join(unsupported)} "
+            f"(supported: {', '.join(sorted(SUPPORTED_OPERATIONS))})"
+        )
+    streaming = [op for op in mix if op in STREAMING_OPERATIONS]
+    if streaming and not args.url:
+        raise SystemExit(f"{', '.join(streaming)} needs a real server (--url)")
+
+    app = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30)
+    else:
+        # 프로세스 내 실행: 임시 DB(또는 --db) 로 앱을 띄우고 startup/shutdown 을 직접 호출.
+        # 셸에 SNS_DB_PATH 가 남아 있어도 실제 DB 에 시드하지 않도록 항상 덮어쓴다
+        os.environ["SNS_DB_PATH"] = args.db or os.path.join(
+            tempfile.mkdtemp(prefix="sns-load-"), "load.db"
+        )
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+        from app import create_app
+
+        app = create_app()
+        await app.router.startup()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30
+        )
+
+    state = State()
+    try:
+        seed_time = await seed(
+            client,
+            state,
+            args.posts,
+            args.comments_per_post,
+            args.likes_per_post,
+            args.seed_batch,
+        )
+        print(f"seeded {len(state.posts)} posts in {seed_time:.1f}s")
+        if args.warmup:
+            await run_load(
+                client, operations, mix, state, args.concurrency, args.warmup, 0
+            )
+        elapsed, total, report = await run_load(
+            client,
+            operations,
+            mix,
+            state,
+            args.concurrency,
+            args.duration,
+            args.requests,
+        )
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+
+    return {
+        "target": args.url or "in-process",
+        "scenario": args.mix or args.scenario,
+        "concurrency": args.concurrency,
+        "seed": {
+            "posts": args.posts,
+            "commentsPerPost": args.comments_per_post,
+            "likesPerPost": args.likes_per_post,
+        },
+        "env": {k: v for k, v in os.environ.items() if k.startswith("SNS_")},
+        "elapsed": elapsed,
+        "requests": total,
+        "throughput": total / elapsed if elapsed else 0.0,
+        "operations": report,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="대상 서버 주소 (생략 시 프로세스 내 ASGI 앱)")
+    parser.add_argument("--db", help="프로세스 내 실행 시 시드할 SQLite 파일 (생략 시 매번 새 임시 DB)")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="read-heavy")
+    parser.add_argument("--mix", help="operationId=가중치,... (시나리오 대신 사용)")
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--comments-per-post", type=int, default=5)
+    parser.add_argument("--likes-per-post", type=int, default=5)
+    parser.add_argument("--seed-batch", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--requests", type=int, default=0, help="총 요청 수 제한")
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    if args.url and args.db:
+        parser.error("--db applies only to the in-process app (omit --url)")
+    if args.requests:
+        args.duration = 0
+
+    result = asyncio.run(main_async(args))
+    print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print("REGRESSION (threshold {:.0%}):".format(args.threshold))
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print("no regression against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
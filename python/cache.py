@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+
+import config
+
+
+class LRUCache:
+    # 크기 제한 + LRU 축출 + 선택적 TTL 을 가진 프로세스 내 읽기 캐시.
+    # 항목마다 태그를 붙여 두고, 쓰기 시 태그 단위로 정확히 무효화한다.
+    # 읽기 도중 무효화가 일어나면(generation 변경) 그 결과는 저장하지 않아
+    # 커밋 전 값을 커밋 후에 캐시에 넣는 경쟁을 막는다.
+
+    def __init__(self, max_size, ttl=0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self._data = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, tags, expires = entry
+            if expires and expires < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, tags=(), generation=None):
+        if not self.enabled:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, tags, expires)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.max_size:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, tags, _ = self._data.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, key):
+        with self._lock:
+            self.generation += 1
+            if key in self._data:
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_tags(self, *tags):
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "maxSize": self.max_size,
+                "ttl": self.ttl,
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRatio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+cache = LRUCache(config.CACHE_SIZE, config.CACHE_TTL)
+
+
+# 태그: 게시물 한 건(목록 페이지 포함), 게시물의 댓글들, 첫 페이지(새 글이 나타나는 곳)
+def post_tag(post_id):
+    return ("post", post_id)
+
+
+def comments_tag(post_id):
+    return ("comments", post_id)
+
+
+FEED_HEAD_TAG = ("feed-head",)
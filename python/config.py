@@ -0,0 +1,144 @@
+import os
+
+BASE_DIR = os.path.dirname(__file__)
+
+
+def _env_str(name, default):
+    return os.environ.get(name, default)
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# 저장소 백엔드: sqlite(기본) 또는 memory(프로세스 내 메모리, 재시작 시 사라짐)
+BACKEND = _env_str("SNS_BACKEND", "sqlite")
+
+# 데이터베이스 파일 위치 (기본은 git 에서 제외된 data/ 아래. 없으면 시작할 때 만든다)
+DB_PATH = _env_str("SNS_DB_PATH", os.path.join(BASE_DIR, "data", "sns_api.db"))
+
+# 1이면 시작할 때마다 DB 파일을 삭제하고 새로 만든다(워크숍용). 기본은 영속 모드
+DB_RESET = _env_bool("SNS_DB_RESET", False)
+
+# 쓰기 샤딩: 2 이상이면 게시물(과 댓글/좋아요)을 postId 해시로 N 개의 DB 파일에 나눠 저장
+# (DB_PATH 가 sns_api.db 면 sns_api.shard0.db ... 를 사용). 바꾸면 데이터를 다시 나눠야 한다
+DB_SHARDS = _env_int("SNS_DB_SHARDS", 1)
+
+# 다중 프로세스 실행 (python main.py --workers N)
+#   WORKERS: 런처가 워커에게 알려 주는 워커 프로세스 수
+#   DB_INITIALIZED: 런처(부모 프로세스)가 DB 초기화를 이미 마쳤음 (워커는 DB_RESET 을 건너뜀)
+#   DB_WATCH: 다른 프로세스의 커밋을 PRAGMA data_version 으로 감지해 캐시/ETag 를 비움.
+#     런처가 워커를 2개 이상 띄우면 켜지고, uvicorn --workers 나 같은 파일을 쓰는 별도
+#     프로세스는 직접 1 로 켜야 한다. 자기 커밋도 감지되므로 단일 프로세스에서는 끈다
+#   DB_WATCH_INTERVAL: DB_WATCH 가 켜졌을 때 data_version 확인 주기(초)
+WORKERS = _env_int("SNS_WORKERS", 1)
+DB_INITIALIZED = _env_bool("SNS_DB_INITIALIZED", False)
+DB_WATCH = _env_bool("SNS_DB_WATCH", WORKERS > 1)
+DB_WATCH_INTERVAL = _env_float("SNS_DB_WATCH_INTERVAL", 0.05)
+
+# 쓰기 락 대기 시간(초)과, 그래도 SQLITE_BUSY 가 나면 저장소 호출을 다시 시도하는 횟수
+DB_BUSY_TIMEOUT = _env_float("SNS_DB_BUSY_TIMEOUT", 5.0)
+DB_BUSY_RETRIES = _env_int("SNS_DB_BUSY_RETRIES", 5)
+
+# 커넥션 풀: 워커 스레드 수(anyio 기본 40)에 맞춰 연결을 재사용
+DB_POOL_SIZE = _env_int("SNS_DB_POOL_SIZE", 40)
+DB_POOL_TIMEOUT = _env_float("SNS_DB_POOL_TIMEOUT", 30.0)
+
+# 블로킹 DB 호출을 실행할 위치
+#   dedicated: DB 전용 스레드 풀(크기 = 커넥션 풀 크기)에서 실행 (async 경로)
+#   threadpool: Starlette 기본 anyio 스레드 풀에서 실행 (기존 동기 라우트와 동일)
+DB_EXECUTOR = _env_str("SNS_DB_EXECUTOR", "dedicated")
+
+# 연결 생성 시 한 번만 적용되는 PRAGMA 설정
+DB_JOURNAL_MODE = _env_str("SNS_DB_JOURNAL_MODE", "WAL")
+DB_SYNCHRONOUS = _env_str("SNS_DB_SYNCHRONOUS", "NORMAL")
+DB_CACHE_SIZE_KB = _env_int("SNS_DB_CACHE_SIZE_KB", 16384)
+DB_MMAP_SIZE = _env_int("SNS_DB_MMAP_SIZE", 256 * 1024 * 1024)
+
+# 목록 API 페이지 크기
+PAGE_DEFAULT_LIMIT = _env_int("SNS_PAGE_DEFAULT_LIMIT", 20)
+PAGE_MAX_LIMIT = _env_int("SNS_PAGE_MAX_LIMIT", 100)
+
+# include=comments 로 게시물에 임베드하는 기본 댓글 수
+EMBED_COMMENTS_DEFAULT = _env_int("SNS_EMBED_COMMENTS_DEFAULT", 3)
+
+# 인기 게시물 순위 (GET /api/posts/trending)
+#   TRENDING_HALF_LIFE: 좋아요/댓글의 영향이 절반으로 줄어드는 시간(초)
+#   TRENDING_LIKE_WEIGHT / TRENDING_COMMENT_WEIGHT: 이벤트 한 건의 가중치
+#   TRENDING_MAX_POSTS: 순위에 유지하는 최대 게시물 수 (시작 시 최근 게시물 수만큼 채움)
+#   TRENDING_MIN_SCORE: 감쇠 후 이 점수 아래로 식은 게시물은 순위에서 뺀다
+#   TRENDING_DECAY_INTERVAL: 점수 감쇠를 다시 계산하는 주기(초)
+#   TRENDING_RESYNC_INTERVAL: 다른 워커가 DB 를 바꿨을 때(SNS_DB_WATCH) 좋아요/댓글 수 차이를 순위에 반영하는 최소 간격(초)
+TRENDING_HALF_LIFE = _env_float("SNS_TRENDING_HALF_LIFE", 6 * 3600.0)
+TRENDING_LIKE_WEIGHT = _env_float("SNS_TRENDING_LIKE_WEIGHT", 1.0)
+TRENDING_COMMENT_WEIGHT = _env_float("SNS_TRENDING_COMMENT_WEIGHT", 2.0)
+TRENDING_MAX_POSTS = _env_int("SNS_TRENDING_MAX_POSTS", 10000)
+TRENDING_MIN_SCORE = _env_float("SNS_TRENDING_MIN_SCORE", 0.05)
+TRENDING_DECAY_INTERVAL = _env_float("SNS_TRENDING_DECAY_INTERVAL", 60.0)
+TRENDING_RESYNC_INTERVAL = _env_float("SNS_TRENDING_RESYNC_INTERVAL", 5.0)
+
+# 스트리밍 모드(stream=1 또는 Accept: application/x-ndjson)에서 한 번에 읽는 행 수
+STREAM_BATCH_SIZE = _env_int("SNS_STREAM_BATCH_SIZE", 500)
+
+# 실시간 이벤트(GET /api/stream, SSE)
+#   EVENTS_QUEUE_SIZE: 구독자별로 쌓아 두는 최대 이벤트 수
+#   EVENTS_SLOW_POLICY: 큐가 넘친 느린 구독자 처리 (drop: 오래된 것부터 버림, disconnect: 연결 끊기)
+#   EVENTS_MAX_SUBSCRIBERS: 프로세스당 최대 구독자 수 (넘으면 503)
+#   EVENTS_HEARTBEAT: 연결 유지용 주석 줄을 보내는 주기(초)
+EVENTS_QUEUE_SIZE = _env_int("SNS_EVENTS_QUEUE_SIZE", 256)
+EVENTS_SLOW_POLICY = _env_str("SNS_EVENTS_SLOW_POLICY", "drop")
+EVENTS_MAX_SUBSCRIBERS = _env_int("SNS_EVENTS_MAX_SUBSCRIBERS", 50000)
+EVENTS_HEARTBEAT = _env_float("SNS_EVENTS_HEARTBEAT", 15.0)
+#   EVENTS_RELAY: 다른 워커에서 발행된 이벤트도 받도록 DB 옆 이벤트 파일(*.events.db)로 중계
+#     (기본은 DB_WATCH 와 같음: 여러 프로세스가 같은 DB 를 쓸 때)
+#   EVENTS_RELAY_RETAIN: 이벤트 파일에 남겨 두는 최근 이벤트 수
+EVENTS_RELAY = _env_bool("SNS_EVENTS_RELAY", DB_WATCH)
+EVENTS_RELAY_RETAIN = _env_int("SNS_EVENTS_RELAY_RETAIN", 10000)
+
+# 종료 신호 후 처리 중인 요청을 기다리는 최대 시간(초). 넘으면 남은 요청을 취소하고
+# lifespan shutdown(좋아요 증감분 반영 등)을 실행한다 (python main.py 실행 시)
+SHUTDOWN_TIMEOUT = _env_float("SNS_SHUTDOWN_TIMEOUT", 10.0)
+
+# 일괄 생성 API 한 번에 받을 수 있는 최대 항목 수
+BULK_MAX_ITEMS = _env_int("SNS_BULK_MAX_ITEMS", 10000)
+
+# 전문 검색에서 bm25 순위를 매길 최근 후보 수 (0이면 일치하는 행 전체)
+SEARCH_MAX_CANDIDATES = _env_int("SNS_SEARCH_MAX_CANDIDATES", 5000)
+
+# 좋아요 수 write-behind 집계: posts.likes 증감을 메모리에 모았다가 주기(초)마다 반영
+LIKE_AGGREGATION = _env_bool("SNS_LIKE_AGGREGATION", False)
+LIKE_FLUSH_INTERVAL = _env_float("SNS_LIKE_FLUSH_INTERVAL", 0.5)
+
+# 게시물/댓글 읽기 캐시 (항목 수, 0이면 비활성화) 및 TTL(초, 0이면 무제한)
+CACHE_SIZE = _env_int("SNS_CACHE_SIZE", 10000)
+CACHE_TTL = _env_float("SNS_CACHE_TTL", 0)
+
+# ETag 버전을 따로 기억하는 리소스(게시물/댓글 목록) 수
+ETAG_MAX_KEYS = _env_int("SNS_ETAG_MAX_KEYS", 100000)
+
+# SQL 문장별 실행 시간 집계(/debug/sql)와 느린 쿼리 로그 기준(ms)
+SQL_TRACE = _env_bool("SNS_SQL_TRACE", False)
+SQL_SLOW_MS = _env_float("SNS_SQL_SLOW_MS", 50)
+
+# 요청 수/지연 시간 수집 미들웨어와 /metrics 엔드포인트
+METRICS_ENABLED = _env_bool("SNS_METRICS", True)
+
+# openapi.yaml 파싱 결과(JSON)를 저장해 다음 시작 때 재사용할 디렉터리 (기본: 사용 안 함).
+# 앱 전용 디렉터리를 지정해야 한다 (내 소유가 아니거나 남이 쓸 수 있으면 사용하지 않음)
+OPENAPI_CACHE_DIR = _env_str("SNS_OPENAPI_CACHE_DIR", "")
+
+# /debug/* 진단 엔드포인트 노출 여부 (내부 상태와 SQL 이 보이므로 기본은 끔)
+DEBUG_ENDPOINTS = _env_bool("SNS_DEBUG_ENDPOINTS", False)
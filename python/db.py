@@ -1,61 +1,292 @@
+import asyncio
+import functools
 import os
+import random
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-BASE_DIR = os.path.dirname(__file__)
-DB_PATH = os.path.join(BASE_DIR, "sns_api.db")
+from starlette.concurrency import run_in_threadpool
 
+import config
+from migrations import migrate
+from sqltrace import TracedConnection
 
-def init_db():
-    # 애플리케이션 시작 시 DB를 항상 초기화(기존 파일 삭제)
-    if os.path.exists(DB_PATH):
-        try:
-            os.remove(DB_PATH)
-        except OSError:
-            pass
-
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
-    c.execute(
-        """
-        CREATE TABLE posts (
-            id TEXT PRIMARY KEY,
-            username TEXT NOT NULL,
-            content TEXT NOT NULL,
-            createdAt TEXT NOT NULL,
-            updatedAt TEXT,
-            likes INTEGER DEFAULT 0,
-            commentsCount INTEGER DEFAULT 0
-        )
-        """
-    )
-
-    c.execute(
-        """
-        CREATE TABLE comments (
-            id TEXT PRIMARY KEY,
-            postId TEXT NOT NULL,
-            username TEXT NOT NULL,
-            content TEXT NOT NULL,
-            createdAt TEXT NOT NULL,
-            updatedAt TEXT
-        )
-        """
-    )
-
-    c.execute(
-        """
-        CREATE TABLE likes (
-            postId TEXT NOT NULL,
-            username TEXT NOT NULL,
-            PRIMARY KEY(postId, username)
+DB_PATH = config.DB_PATH
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class DatabaseBusy(Exception):
+    # 다른 프로세스의 쓰기 락 때문에 재시도 후에도 실행하지 못함 (503)
+    pass
+
+
+class ConnectionPool:
+    # 요청마다 connect/close 하지 않고 연결을 재사용하는 풀.
+    # 최대 크기는 워커 스레드 수에 맞추므로 사실상 스레드당 하나의 연결이 된다.
+    # LIFO로 꺼내서 최근에 쓰인(페이지 캐시가 따뜻한) 연결을 우선 사용한다.
+
+    def __init__(self, path, max_size, timeout):
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = []
+        self._cond = threading.Condition()
+        self._size = 0
+        self._in_use = 0
+        self._acquired = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+
+    def _connect(self):
+        # SNS_SQL_TRACE=1 이면 문장별 시간을 재는 연결 클래스로 만든다
+        factory = TracedConnection if config.SQL_TRACE else sqlite3.Connection
+        # timeout: 다른 연결/프로세스가 쓰기 락을 쥐고 있으면 이 시간(초)까지 기다린다 (busy_timeout)
+        conn = sqlite3.connect(
+            self.path,
+            timeout=config.DB_BUSY_TIMEOUT,
+            check_same_thread=False,
+            factory=factory,
         )
-        """
-    )
+        conn.execute(f"PRAGMA journal_mode={config.DB_JOURNAL_MODE}")
+        conn.execute(f"PRAGMA synchronous={config.DB_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size=-{config.DB_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size={config.DB_MMAP_SIZE}")
+        return conn
+
+    def acquire(self):
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        create = False
+        blocked = False
+        with self._cond:
+            while not self._idle and self._size >= self.max_size:
+                blocked = True
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    raise PoolTimeout(f"no connection available in {self.timeout}s")
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                self._size += 1
+                create = True
+        if create:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        waited = time.perf_counter() - start
+        with self._cond:
+            self._in_use += 1
+            self._acquired += 1
+            if blocked:
+                self._waits += 1
+                self._wait_time += waited
+                self._max_wait = max(self._max_wait, waited)
+        return conn
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # 망가진 연결은 풀에 돌려놓지 않고 버린다
+            conn.close()
+            with self._cond:
+                self._in_use -= 1
+                self._size -= 1
+                self._cond.notify()
+            return
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "maxSize": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "inUse": self._in_use,
+                "acquired": self._acquired,
+                "waits": self._waits,
+                "totalWaitMs": self._wait_time * 1000,
+                "maxWaitMs": self._max_wait * 1000,
+            }
+
+
+pool = ConnectionPool(DB_PATH, config.DB_POOL_SIZE, config.DB_POOL_TIMEOUT)
+
+
+@contextmanager
+def init_lock(db_path):
+    # 같은 DB 를 쓰는 프로세스(워커)들이 초기화/마이그레이션을 한 번에 하나씩만 하도록
+    # DB 옆의 잠금 파일에 배타적 파일 락을 건다. 락은 프로세스가 죽으면 OS 가 풀어 준다.
+    with open(db_path + ".lock", "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK 은 10초 후 포기하므로 계속 다시 시도
+                    pass
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
 
-    conn.commit()
-    conn.close()
+def init_db(target=None):
+    target = target or pool
+    target.close_all()
+    db_path = target.path
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    with init_lock(db_path):
+        # 워크숍용: SNS_DB_RESET=1 이면 시작할 때마다 기존 DB 파일을 지우고 새로 만든다.
+        # 다중 워커 런처가 부모 프로세스에서 이미 초기화했다면(SNS_DB_INITIALIZED)
+        # 워커는 서로의 DB 를 지우지 않고 마이그레이션 확인만 한다.
+        if config.DB_RESET and not config.DB_INITIALIZED:
+            for path in (db_path, db_path + "-wal", db_path + "-shm"):
+                if os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+        conn = sqlite3.connect(db_path, timeout=config.DB_BUSY_TIMEOUT)
+        try:
+            conn.execute(f"PRAGMA journal_mode={config.DB_JOURNAL_MODE}")
+            migrate(conn)
+        finally:
+            conn.close()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=config.DB_POOL_SIZE, thread_name_prefix="sns-db"
+                )
+    return _executor
+
+
+def _is_busy(exc):
+    return "locked" in str(exc) or "busy" in str(exc)
+
+
+def retry_busy(fn, *args):
+    # busy_timeout 을 넘겨 SQLITE_BUSY 가 난 호출은 트랜잭션이 롤백된 상태이므로
+    # 짧게 쉬었다가(지수 백오프 + 지터) 통째로 다시 실행한다
+    for attempt in range(config.DB_BUSY_RETRIES + 1):
+        try:
+            return fn(*args)
+        except sqlite3.OperationalError as exc:
+            if not _is_busy(exc):
+                raise
+            if attempt == config.DB_BUSY_RETRIES:
+                raise DatabaseBusy(str(exc)) from exc
+            time.sleep(random.uniform(0.5, 1.0) * 0.01 * 2**attempt)
+
+
+class DbCalls:
+    # run_db 로 제출한 저장소 호출 수 (/metrics 용). 실행기 내부 속성을 읽지 않고 직접 센다
+    #   pending: 제출했지만 끝나지 않은 호출 (스레드를 기다리는 것 + 실행 중인 것)
+    #   running: 스레드에서 실행 중인 호출
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.total = 0
+
+    def submitted(self):
+        with self._lock:
+            self.pending += 1
+            self.total += 1
+
+    def finished(self):
+        with self._lock:
+            self.pending -= 1
+
+    def run(self, fn, *args):
+        with self._lock:
+            self.running += 1
+        try:
+            return retry_busy(fn, *args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def stats(self):
+        with self._lock:
+            # 기다리던 요청이 취소되면 작업보다 먼저 pending 이 줄 수 있다
+            return self.running, max(self.pending - self.running, 0), self.total
+
+
+db_calls = DbCalls()
+
+
+async def run_db(fn, *args):
+    # async 라우트에서 블로킹 저장소 호출을 이벤트 루프 밖에서 실행
+    db_calls.submitted()
+    try:
+        if config.DB_EXECUTOR == "threadpool":
+            return await run_in_threadpool(db_calls.run, fn, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_executor(), functools.partial(db_calls.run, fn, *args)
+        )
+    finally:
+        db_calls.finished()
 
 
-def get_conn():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+def shutdown_db():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    pool.close_all()
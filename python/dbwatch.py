@@ -0,0 +1,50 @@
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class DataVersionWatcher:
+    # 같은 DB 파일을 쓰는 다른 프로세스(워커)의 쓰기를 감지한다.
+    # PRAGMA data_version 은 "다른 연결"이 커밋할 때마다 바뀌므로, 전용 연결로
+    # 주기적으로 읽어 값이 달라지면 on_change 를 부른다(프로세스 내 캐시/ETag 비우기).
+    # 같은 프로세스의 풀 연결이 커밋해도 바뀌므로 로컬 쓰기에도 한 번씩 비워진다.
+
+    def __init__(self, path, interval, on_change):
+        self.path = path
+        self.interval = interval
+        self.on_change = on_change
+        self.changes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            last = conn.execute("PRAGMA data_version").fetchone()[0]
+            while not self._stop.wait(self.interval):
+                try:
+                    version = conn.execute("PRAGMA data_version").fetchone()[0]
+                    if version != last:
+                        last = version
+                        self.changes += 1
+                        self.on_change()
+                except Exception:
+                    logger.exception("data_version check failed")
+        finally:
+            conn.close()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="sns-db-watch", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,59 @@
+from fastapi import APIRouter
+
+import config
+
+from cache import cache
+from db import pool
+from pubsub import bus
+from trending import trending
+from repository import repo
+from sqltrace import stats as sql_stats
+
+router = APIRouter(prefix="/debug")
+
+
+@router.get("/pool")
+def pool_stats():
+    if len(repo.pools) > 1:
+        return {"shards": [p.stats() for p in repo.pools]}
+    return pool.stats()
+
+
+@router.get("/cache")
+def cache_stats():
+    return cache.stats()
+
+
+@router.get("/likes")
+def like_stats():
+    stats = repo.like_stats()
+    if stats is None:
+        return {"enabled": False}
+    return {"enabled": True, **stats}
+
+
+@router.get("/events")
+def event_stats():
+    return bus.stats()
+
+
+@router.get("/trending")
+def trending_stats():
+    return trending.stats()
+
+
+@router.get("/sql")
+def sql_stats_view(limit: int = 50):
+    if not config.SQL_TRACE:
+        return {"enabled": False}
+    return {"enabled": True, **sql_stats.snapshot(limit)}
+
+
+# 상태를 바꾸는 초기화는 GET 이 아닌 DELETE (프리페치/크롤러가 지우지 않도록)
+@router.delete("/sql")
+def sql_stats_reset(limit: int = 50):
+    if not config.SQL_TRACE:
+        return {"enabled": False}
+    result = {"enabled": True, **sql_stats.snapshot(limit)}
+    sql_stats.reset()
+    return result
@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LikeAggregator:
+    # 좋아요 수 write-behind 집계.
+    # like/unlike 요청은 likes 테이블에만 즉시 쓰고(중복 검사는 PK가 그대로 담당),
+    # posts.likes 증감분은 메모리에 모아 두었다가 주기적으로 한 트랜잭션에 반영한다.
+    # 인기 게시물 한 행에 UPDATE 가 몰려 쓰기 락을 두고 경쟁하는 일을 없앤다.
+    #
+    # 읽기는 "DB 값 + 미반영 증감분" 으로 계산한다. flush 중에는 시퀀스 번호가
+    # 홀수가 되므로(seqlock) 읽기 쪽은 flush 와 겹친 결과를 버리고 다시 읽는다.
+    #
+    # 요청은 풀 연결을 쥔 채 add()/read_consistent() 를 부르므로, flush 는 _lock 을 쥐거나
+    # 시퀀스를 홀수로 만든 채 풀 연결을 기다리면 안 된다(서로를 기다리는 교착).
+    # 그래서 연결을 먼저 얻고, _lock 은 증감분을 바꿔치기하는 동안만 쥔다.
+
+    def __init__(self, pool, interval):
+        self.pool = pool
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        # flush 는 한 번에 하나만 (백그라운드 스레드와 stop() 의 마지막 flush)
+        self._flush_lock = threading.Lock()
+        self._seq = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.flushes = 0
+        self.flushed_posts = 0
+        self.last_flush_ms = 0.0
+
+    def add(self, post_id, delta):
+        with self._lock:
+            value = self._pending.get(post_id, 0) + delta
+            if value:
+                self._pending[post_id] = value
+            else:
+                self._pending.pop(post_id, None)
+
+    def pending(self, post_id):
+        return self._pending.get(post_id, 0)
+
+    def read_consistent(self, read):
+        while True:
+            seq = self._seq
+            if seq % 2 == 0:
+                value = read()
+                if self._seq == seq:
+                    return value
+            time.sleep(0.0005)
+
+    def flush(self):
+        with self._flush_lock:
+            if not self._pending:
+                return 0
+            with self.pool.connection() as conn:
+                with self._lock:
+                    batch, self._pending = self._pending, {}
+                    self._seq += 1
+                start = time.perf_counter()
+                try:
+                    conn.executemany(
+                        "UPDATE posts SET likes = likes + ? WHERE id=?",
+                        [(delta, post_id) for post_id, delta in batch.items()],
+                    )
+                    conn.commit()
+                except Exception:
+                    # 반영 실패 시 증감분을 되돌려 두고 다음 주기에 다시 시도
+                    with self._lock:
+                        for post_id, delta in batch.items():
+                            value = self._pending.get(post_id, 0) + delta
+                            self._pending[post_id] = value
+                    raise
+                finally:
+                    self._seq += 1
+            self.flushes += 1
+            self.flushed_posts += len(batch)
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+            return len(batch)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("like counter flush failed")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="sns-like-flush", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "pendingPosts": len(self._pending),
+                "pendingDelta": sum(self._pending.values()),
+                "flushes": self.flushes,
+                "flushedPosts": self.flushed_posts,
+                "lastFlushMs": self.last_flush_ms,
+            }
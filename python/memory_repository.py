@@ -0,0 +1,382 @@
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from repository import Repository, attach_embeds, next_page
+from utils import (
+    iso_now,
+    new_id,
+    encode_cursor,
+    decode_cursor,
+    not_found,
+    bad_request,
+    item_result,
+    words,
+    search_terms,
+    search_cursor,
+)
+
+
+class PostRecord:
+    __slots__ = (
+        "id",
+        "username",
+        "content",
+        "createdAt",
+        "updatedAt",
+        "likes",
+        "commentsCount",
+        "comment_keys",
+        "liked_by",
+    )
+
+    def __init__(self, id_, username, content, created_at):
+        self.id = id_
+        self.username = username
+        self.content = content
+        self.createdAt = created_at
+        self.updatedAt = None
+        self.likes = 0
+        self.commentsCount = 0
+        # (createdAt, id) 순으로 정렬된 댓글 키
+        self.comment_keys = []
+        self.liked_by = set()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "content": self.content,
+            "createdAt": self.createdAt,
+            "updatedAt": self.updatedAt,
+            "likes": self.likes,
+            "commentsCount": self.commentsCount,
+        }
+
+
+class CommentRecord:
+    __slots__ = ("id", "postId", "username", "content", "createdAt", "updatedAt")
+
+    def __init__(self, id_, post_id, username, content, created_at):
+        self.id = id_
+        self.postId = post_id
+        self.username = username
+        self.content = content
+        self.createdAt = created_at
+        self.updatedAt = None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "postId": self.postId,
+            "username": self.username,
+            "content": self.content,
+            "createdAt": self.createdAt,
+            "updatedAt": self.updatedAt,
+        }
+
+
+class MemoryRepository(Repository):
+    # SQL 없이 프로세스 메모리만 쓰는 저장소 (임시/테스트 배포용).
+    # id -> 레코드 dict, (createdAt, id) 로 정렬된 피드 키 목록, 게시물별 댓글 키 목록을
+    # 유지하므로 SQLite 백엔드와 같은 키셋 커서 형식을 그대로 쓸 수 있다.
+    # 재시작하면 데이터가 사라지고, 워커 프로세스 간에 공유되지 않는다.
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._posts = {}
+        self._comments = {}
+        self._feed = []
+
+    def _post(self, post_id):
+        post = self._posts.get(post_id)
+        if post is None:
+            raise not_found()
+        return post
+
+    # 게시물
+
+    def list_posts(self, limit, cursor=None):
+        with self._lock:
+            if cursor:
+                end = bisect_left(self._feed, tuple(decode_cursor(cursor, str, str)))
+            else:
+                end = len(self._feed)
+            keys = self._feed[max(0, end - limit - 1) : end]
+            posts = [self._posts[id_].to_dict() for _, id_ in reversed(keys)]
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            next_cursor = encode_cursor(posts[-1]["createdAt"], posts[-1]["id"])
+        return posts, next_cursor
+
+    def _insert_post(self, username, content):
+        post = PostRecord(new_id(), username, content, iso_now())
+        self._posts[post.id] = post
+        insort(self._feed, (post.createdAt, post.id))
+        return post
+
+    def create_post(self, username, content):
+        with self._lock:
+            return self._insert_post(username, content).to_dict()
+
+    def get_post(self, post_id):
+        with self._lock:
+            return self._post(post_id).to_dict()
+
+    def update_post(self, post_id, username, content):
+        with self._lock:
+            post = self._post(post_id)
+            post.username = username
+            post.content = content
+            post.updatedAt = iso_now()
+            return post.to_dict()
+
+    def delete_post(self, post_id):
+        with self._lock:
+            post = self._post(post_id)
+            del self._posts[post_id]
+            key = (post.createdAt, post.id)
+            del self._feed[bisect_left(self._feed, key)]
+            for _, comment_id in post.comment_keys:
+                del self._comments[comment_id]
+
+    # 댓글
+
+    def list_comments(self, post_id, limit, after=None):
+        # SQLite 백엔드처럼 커서 형식부터 검사한다 (없는 게시물이어도 400)
+        bound = tuple(decode_cursor(after, str, str)) if after else None
+        with self._lock:
+            keys = self._post(post_id).comment_keys
+            start = bisect_right(keys, bound) if bound else 0
+            comments = [
+                self._comments[id_].to_dict()
+                for _, id_ in keys[start : start + limit + 1]
+            ]
+        next_cursor = None
+        if len(comments) > limit:
+            comments = comments[:limit]
+            next_cursor = encode_cursor(comments[-1]["createdAt"], comments[-1]["id"])
+        return comments, next_cursor
+
+    # 사용자별 목록: 사용자 색인 없이 전체를 훑는다 (임시/테스트용이라 단순하게 둠)
+
+    def _user_page(self, records, username, limit, cursor):
+        bound = tuple(decode_cursor(cursor, str, str)) if cursor else None
+        with self._lock:
+            mine = [
+                (r.createdAt, r.id, r)
+                for r in records.values()
+                if r.username == username
+            ]
+            if bound:
+                mine = [item for item in mine if item[:2] < bound]
+            page = [
+                item[2].to_dict()
+                for item in heapq.nlargest(limit + 1, mine, key=lambda i: i[:2])
+            ]
+        return next_page(page, limit, lambda item: (item["createdAt"], item["id"]))
+
+    def list_user_posts(self, username, limit, cursor=None):
+        return self._user_page(self._posts, username, limit, cursor)
+
+    def list_user_comments(self, username, limit, cursor=None):
+        return self._user_page(self._comments, username, limit, cursor)
+
+    def list_user_likes(self, username, limit, cursor=None):
+        with self._lock:
+            liked = [p for p in self._posts.values() if username in p.liked_by]
+            if cursor:
+                (after,) = decode_cursor(cursor, str)
+                liked = [p for p in liked if p.id < after]
+            page = [
+                p.to_dict()
+                for p in heapq.nlargest(limit + 1, liked, key=lambda p: p.id)
+            ]
+        return next_page(page, limit, lambda post: (post["id"],))
+
+    def get_posts(self, post_ids):
+        with self._lock:
+            return [
+                self._posts[id_].to_dict() for id_ in post_ids if id_ in self._posts
+            ]
+
+    def recent_engagement(self, limit):
+        with self._lock:
+            posts = [self._posts[id_] for _, id_ in self._feed[-limit:]]
+        return [(p.id, p.likes, p.commentsCount, p.createdAt) for p in reversed(posts)]
+
+    def embed(self, posts, comments_limit=None, liked_by=None):
+        comments_of = {}
+        liked = set() if liked_by is not None else None
+        with self._lock:
+            for post in posts:
+                record = self._posts.get(post["id"])
+                if record is None:
+                    continue
+                if comments_limit is not None:
+                    comments_of[post["id"]] = [
+                        self._comments[id_].to_dict()
+                        for _, id_ in record.comment_keys[: comments_limit + 1]
+                    ]
+                if liked is not None and liked_by in record.liked_by:
+                    liked.add(post["id"])
+        return attach_embeds(posts, comments_limit, comments_of, liked)
+
+    def _insert_comment(self, post, username, content):
+        comment = CommentRecord(new_id(), post.id, username, content, iso_now())
+        self._comments[comment.id] = comment
+        insort(post.comment_keys, (comment.createdAt, comment.id))
+        post.commentsCount += 1
+        return comment
+
+    def create_comment(self, post_id, username, content):
+        with self._lock:
+            return self._insert_comment(
+                self._post(post_id), username, content
+            ).to_dict()
+
+    def _comment(self, post_id, comment_id):
+        comment = self._comments.get(comment_id)
+        if comment is None or comment.postId != post_id:
+            raise not_found()
+        return comment
+
+    def get_comment(self, post_id, comment_id):
+        with self._lock:
+            return self._comment(post_id, comment_id).to_dict()
+
+    def update_comment(self, post_id, comment_id, username, content):
+        with self._lock:
+            comment = self._comment(post_id, comment_id)
+            comment.username = username
+            comment.content = content
+            comment.updatedAt = iso_now()
+            return comment.to_dict()
+
+    def delete_comment(self, post_id, comment_id):
+        with self._lock:
+            comment = self._comment(post_id, comment_id)
+            post = self._posts[post_id]
+            del self._comments[comment_id]
+            keys = post.comment_keys
+            del keys[bisect_left(keys, (comment.createdAt, comment.id))]
+            post.commentsCount -= 1
+
+    # 좋아요
+
+    def like_post(self, post_id, username):
+        with self._lock:
+            post = self._post(post_id)
+            if username in post.liked_by:
+                raise bad_request()
+            post.liked_by.add(username)
+            post.likes += 1
+            return post.likes
+
+    def unlike_post(self, post_id, username):
+        with self._lock:
+            post = self._post(post_id)
+            if username not in post.liked_by:
+                raise bad_request()
+            post.liked_by.discard(username)
+            post.likes -= 1
+
+    # 일괄 생성
+
+    def bulk_create_posts(self, items):
+        with self._lock:
+            return [
+                item_result(201, self._insert_post(username, content).to_dict())
+                for username, content in items
+            ]
+
+    def bulk_create_comments(self, items):
+        results = []
+        with self._lock:
+            for post_id, username, content in items:
+                post = self._posts.get(post_id)
+                if post is None:
+                    results.append(item_result(404))
+                    continue
+                comment = self._insert_comment(post, username, content)
+                results.append(item_result(201, comment.to_dict()))
+        return results
+
+    def bulk_like(self, items):
+        results = []
+        with self._lock:
+            for post_id, username in items:
+                post = self._posts.get(post_id)
+                if post is None:
+                    results.append(item_result(404))
+                elif username in post.liked_by:
+                    results.append(item_result(400))
+                else:
+                    post.liked_by.add(username)
+                    post.likes += 1
+                    results.append(
+                        item_result(
+                            201,
+                            {
+                                "postId": post_id,
+                                "username": username,
+                                "totalLikes": post.likes,
+                            },
+                        )
+                    )
+            # 단일 좋아요 API 와 달리 totalLikes 는 배치 처리 완료 시점의 값으로 맞춘다.
+            # 락을 놓은 뒤에 다시 읽으면 동시에 삭제된 게시물에서 KeyError 가 나므로 락 안에서 계산
+            totals = {
+                post_id: self._posts[post_id].likes
+                for post_id, _ in items
+                if post_id in self._posts
+            }
+        for result in results:
+            if result["status"] == 201:
+                data = result["data"]
+                data["totalLikes"] = totals[data["postId"]]
+        return results
+
+    # 전문 검색: 색인 없이 전체를 훑는 단순 구현. SQLite 백엔드처럼 모든 단어를
+    # 포함해야 하고 마지막 단어만 접두어로 비교하며, 일치한 단어 수를 점수로 쓴다.
+
+    def search(self, q, kind, limit, cursor=None):
+        terms = search_terms(q)
+        offset = search_cursor(cursor)
+
+        def score(content):
+            tokens = words(content)
+            total = 0
+            for i, term in enumerate(terms):
+                if i == len(terms) - 1:
+                    n = sum(1 for token in tokens if token.startswith(term))
+                else:
+                    n = tokens.count(term)
+                if not n:
+                    return 0
+                total += n
+            return total
+
+        hits = []
+        with self._lock:
+            if kind != "comments":
+                for post in self._posts.values():
+                    s = score(post.content)
+                    if s:
+                        hits.append((s, post.createdAt, "post", post))
+            if kind != "posts":
+                for comment in self._comments.values():
+                    s = score(comment.content)
+                    if s:
+                        hits.append((s, comment.createdAt, "comment", comment))
+            hits.sort(key=lambda hit: (hit[0], hit[1]), reverse=True)
+            page = [
+                {"type": type_, "score": s, "data": record.to_dict()}
+                for s, _, type_, record in hits[offset : offset + limit]
+            ]
+        next_cursor = (
+            encode_cursor(offset + limit) if len(hits) > offset + limit else None
+        )
+        # 후보 제한 없이 전체를 훑는다
+        return page, next_cursor, False
@@ -0,0 +1,181 @@
+import time
+from bisect import bisect_left
+
+import anyio.to_thread
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+import db
+from pubsub import bus
+from repository import repo
+
+# 지연 시간 히스토그램 버킷 상한(초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+UNMATCHED = "<unmatched>"
+# 끝나지 않는 스트림은 지연 시간/처리 중 요청 수에서 뺀다 (연결 수는 sns_event_subscribers)
+EXCLUDED_PATHS = frozenset({"/api/stream"})
+
+
+class RouteStats:
+    __slots__ = ("statuses", "buckets", "count", "total")
+
+    def __init__(self):
+        self.statuses = {}
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, status, seconds):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+
+class Metrics:
+    # 요청 수/상태 코드/지연 시간 히스토그램을 (메서드, 라우트 템플릿) 별로 집계한다.
+    # 미들웨어는 이벤트 루프 스레드에서만 값을 갱신하므로 락이 필요 없다.
+    # 라우트 템플릿 기준이라 경로 파라미터 값이 늘어나도 시계열 수는 고정된다.
+
+    def __init__(self):
+        self.routes = {}
+        self.in_flight = 0
+
+    def observe(self, method, template, status, seconds):
+        key = (method, template)
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats()
+        stats.observe(status, seconds)
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    # 순수 ASGI 미들웨어 (BaseHTTPMiddleware 의 태스크/스트림 오버헤드 없음)
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.observe(
+                scope["method"],
+                route.path if route is not None else UNMATCHED,
+                status,
+                time.perf_counter() - start,
+            )
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _threadpool_stats():
+    # anyio 기본 스레드 풀의 사용 중/대기 작업 수
+    limiter = anyio.to_thread.current_default_thread_limiter().statistics()
+    return limiter.borrowed_tokens, limiter.tasks_waiting
+
+
+def render():
+    lines = [
+        "# HELP sns_http_requests_total HTTP requests by route template and status.",
+        "# TYPE sns_http_requests_total counter",
+    ]
+    routes = sorted(metrics.routes.items())
+    for (method, template), stats in routes:
+        for status, count in sorted(stats.statuses.items()):
+            lines.append(
+                f'sns_http_requests_total{{method="{method}",route="{_label(template)}",'
+                f'status="{status}"}} {count}'
+            )
+
+    lines += [
+        "# HELP sns_http_request_duration_seconds HTTP request latency by route template.",
+        "# TYPE sns_http_request_duration_seconds histogram",
+    ]
+    for (method, template), stats in routes:
+        labels = f'method="{method}",route="{_label(template)}"'
+        cumulative = 0
+        for bound, count in zip(BUCKETS, stats.buckets):
+            cumulative += count
+            lines.append(
+                f'sns_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append(
+            f'sns_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}'
+        )
+        lines.append(f"sns_http_request_duration_seconds_sum{{{labels}}} {stats.total}")
+        lines.append(
+            f"sns_http_request_duration_seconds_count{{{labels}}} {stats.count}"
+        )
+
+    db_running, db_queued, db_total = db.db_calls.stats()
+    anyio_busy, anyio_waiting = _threadpool_stats()
+    # 샤딩하면 샤드 풀들의 합계
+    pools = [p.stats() for p in repo.pools or (db.pool,)]
+    pool = {key: sum(p[key] for p in pools) for key in ("size", "inUse", "waits")}
+    gauges = (
+        (
+            "sns_http_requests_in_flight",
+            "HTTP requests being served.",
+            metrics.in_flight,
+        ),
+        (
+            "sns_db_executor_running",
+            "Repository calls running on a DB thread.",
+            db_running,
+        ),
+        (
+            "sns_db_executor_queue_depth",
+            "Repository calls waiting for a DB thread.",
+            db_queued,
+        ),
+        ("sns_threadpool_busy", "Busy anyio worker threads.", anyio_busy),
+        ("sns_threadpool_waiting", "Tasks waiting for an anyio thread.", anyio_waiting),
+        ("sns_db_pool_size", "Open SQLite connections.", pool["size"]),
+        ("sns_db_pool_in_use", "SQLite connections checked out.", pool["inUse"]),
+        ("sns_event_subscribers", "Open /api/stream connections.", len(bus)),
+    )
+    for name, help_text, value in gauges:
+        lines += [
+            f"# HELP {name} {help_text}",
+            f"# TYPE {name} gauge",
+            f"{name} {value}",
+        ]
+    lines += [
+        "# HELP sns_db_calls_total Repository calls submitted through run_db.",
+        "# TYPE sns_db_calls_total counter",
+        f"sns_db_calls_total {db_total}",
+        "# HELP sns_db_pool_waits_total Connection acquisitions that had to wait.",
+        "# TYPE sns_db_pool_waits_total counter",
+        f"sns_db_pool_waits_total {pool['waits']}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,209 @@
+# 스키마 마이그레이션. PRAGMA user_version 에 적용된 버전을 저장하고
+# 필요한 단계만 실행한다. 각 단계는 IF NOT EXISTS 로 작성해 버전 정보가
+# 없는 기존 DB(이전 버전에서 만든 파일)에 다시 적용해도 안전하다.
+# 새 스키마 변경은 목록 끝에 단계를 추가한다(기존 단계는 수정하지 않는다).
+
+
+def _fts_statements(table):
+    # 원본 테이블의 seq(INTEGER PRIMARY KEY) 로 연결하는 FTS5 색인과 동기화 트리거
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"content, content='{table}', content_rowid='seq', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"""
+        CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, content) VALUES (new.seq, new.content);
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, content)
+            VALUES ('delete', old.seq, old.content);
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts}_update AFTER UPDATE OF content ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, content)
+            VALUES ('delete', old.seq, old.content);
+            INSERT INTO {fts}(rowid, content) VALUES (new.seq, new.content);
+        END
+        """,
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _rekey_statements(table, columns, names, indexes):
+    # 암시적 rowid 는 VACUUM 때 다시 매겨질 수 있어 FTS 색인과 어긋나므로,
+    # 기존 rowid 값을 그대로 옮긴 명시적 seq INTEGER PRIMARY KEY 로 테이블을 다시 만든다.
+    # (rowid 는 seq 의 별칭이 되므로 rowid 로 조회하는 쿼리는 그대로 동작한다)
+    fts = f"{table}_fts"
+    return [
+        f"DROP TRIGGER IF EXISTS {fts}_insert",
+        f"DROP TRIGGER IF EXISTS {fts}_delete",
+        f"DROP TRIGGER IF EXISTS {fts}_update",
+        f"DROP TABLE IF EXISTS {fts}",
+        f"CREATE TABLE {table}_rekeyed (seq INTEGER PRIMARY KEY, {columns})",
+        f"INSERT INTO {table}_rekeyed (seq, {names}) SELECT rowid, {names} FROM {table}",
+        f"DROP TABLE {table}",
+        f"ALTER TABLE {table}_rekeyed RENAME TO {table}",
+        *indexes,
+        *_fts_statements(table),
+    ]
+
+
+MIGRATIONS = [
+    # 1: 기본 테이블
+    [
+        """
+        CREATE TABLE IF NOT EXISTS posts (
+            id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            content TEXT NOT NULL,
+            createdAt TEXT NOT NULL,
+            updatedAt TEXT,
+            likes INTEGER DEFAULT 0,
+            commentsCount INTEGER DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS comments (
+            id TEXT PRIMARY KEY,
+            postId TEXT NOT NULL,
+            username TEXT NOT NULL,
+            content TEXT NOT NULL,
+            createdAt TEXT NOT NULL,
+            updatedAt TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS likes (
+            postId TEXT NOT NULL,
+            username TEXT NOT NULL,
+            PRIMARY KEY(postId, username)
+        )
+        """,
+    ],
+    # 2: 피드 키셋 페이지네이션 (createdAt DESC, id DESC)
+    [
+        "CREATE INDEX IF NOT EXISTS idx_posts_createdAt ON posts(createdAt, id)",
+    ],
+    # 3: 게시물별 댓글 조회/페이지네이션 (postId 필터 + createdAt ASC, id ASC)
+    [
+        "CREATE INDEX IF NOT EXISTS idx_comments_postId_createdAt "
+        "ON comments(postId, createdAt, id)",
+    ],
+    # 4: 전문 검색. 원본 테이블을 콘텐츠로 쓰는 FTS5 색인을 트리거로 갱신하므로
+    # 게시물/댓글 쓰기와 같은 트랜잭션 안에서 색인도 함께 커밋/롤백된다.
+    # rowid 로 원본 행과 연결하므로 VACUUM 후에는 'rebuild' 를 다시 실행해야 한다.
+    [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+        "content, content='posts', content_rowid='rowid', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        """
+        CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+            INSERT INTO posts_fts(rowid, content) VALUES (new.rowid, new.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, content)
+            VALUES ('delete', old.rowid, old.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF content ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, content)
+            VALUES ('delete', old.rowid, old.content);
+            INSERT INTO posts_fts(rowid, content) VALUES (new.rowid, new.content);
+        END
+        """,
+        "CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5("
+        "content, content='comments', content_rowid='rowid', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        """
+        CREATE TRIGGER IF NOT EXISTS comments_fts_insert AFTER INSERT ON comments BEGIN
+            INSERT INTO comments_fts(rowid, content) VALUES (new.rowid, new.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS comments_fts_delete AFTER DELETE ON comments BEGIN
+            INSERT INTO comments_fts(comments_fts, rowid, content)
+            VALUES ('delete', old.rowid, old.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS comments_fts_update AFTER UPDATE OF content ON comments BEGIN
+            INSERT INTO comments_fts(comments_fts, rowid, content)
+            VALUES ('delete', old.rowid, old.content);
+            INSERT INTO comments_fts(rowid, content) VALUES (new.rowid, new.content);
+        END
+        """,
+        # 기존 행 색인 (새 DB 에서는 빈 테이블이라 즉시 끝난다)
+        "INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')",
+        "INSERT INTO comments_fts(comments_fts) VALUES ('rebuild')",
+    ],
+    # 5: 사용자별 게시물/댓글 타임라인 (username 필터 + createdAt DESC, id DESC)과
+    # 사용자가 좋아요한 게시물 (likes 의 PK 는 postId 가 앞이라 username 으로 찾을 수 없다)
+    [
+        "CREATE INDEX IF NOT EXISTS idx_posts_username_createdAt "
+        "ON posts(username, createdAt, id)",
+        "CREATE INDEX IF NOT EXISTS idx_comments_username_createdAt "
+        "ON comments(username, createdAt, id)",
+        "CREATE INDEX IF NOT EXISTS idx_likes_username ON likes(username, postId)",
+    ],
+    # 6: 전문 검색 색인을 암시적 rowid 대신 명시적 seq INTEGER PRIMARY KEY 에 연결
+    # (VACUUM 후에도 색인이 원본 행과 맞는다). 큰 DB 에서는 테이블 복사와 색인 재구축으로
+    # 한 번 시간이 걸린다
+    [
+        *_rekey_statements(
+            "posts",
+            "id TEXT NOT NULL UNIQUE, username TEXT NOT NULL, content TEXT NOT NULL, "
+            "createdAt TEXT NOT NULL, updatedAt TEXT, likes INTEGER DEFAULT 0, "
+            "commentsCount INTEGER DEFAULT 0",
+            "id, username, content, createdAt, updatedAt, likes, commentsCount",
+            [
+                "CREATE INDEX idx_posts_createdAt ON posts(createdAt, id)",
+                "CREATE INDEX idx_posts_username_createdAt "
+                "ON posts(username, createdAt, id)",
+            ],
+        ),
+        *_rekey_statements(
+            "comments",
+            "id TEXT NOT NULL UNIQUE, postId TEXT NOT NULL, username TEXT NOT NULL, "
+            "content TEXT NOT NULL, createdAt TEXT NOT NULL, updatedAt TEXT",
+            "id, postId, username, content, createdAt, updatedAt",
+            [
+                "CREATE INDEX idx_comments_postId_createdAt "
+                "ON comments(postId, createdAt, id)",
+                "CREATE INDEX idx_comments_username_createdAt "
+                "ON comments(username, createdAt, id)",
+            ],
+        ),
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    # 최신 버전이면 PRAGMA 한 번만 읽고 끝난다 (대용량 DB도 시작 시간에 영향 없음)
+    if schema_version(conn) >= SCHEMA_VERSION:
+        return False
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # 쓰기 락을 잡은 뒤 다시 확인: 다른 프로세스가 먼저 적용했을 수 있다
+        current = schema_version(conn)
+        for statements in MIGRATIONS[current:]:
+            for statement in statements:
+                conn.execute(statement)
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return current < SCHEMA_VERSION
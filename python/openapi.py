@@ -1,33 +1,252 @@
+import gzip
+import hashlib
+import json
+import logging
 import os
-import yaml
+import stat
+import threading
+import time
+
+from fastapi import Request
 from fastapi.openapi.docs import get_swagger_ui_html
-from fastapi.responses import PlainTextResponse, HTMLResponse
+from fastapi.responses import HTMLResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+import config
+from versions import etag_matches, not_modified
+
+logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(__file__)
 OPENAPI_YAML = os.path.abspath(os.path.join(BASE_DIR, "..", "openapi.yaml"))
 
 
-def load_openapi_schema():
-    with open(OPENAPI_YAML, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+def load_openapi_schema(raw=None):
+    # PyYAML 은 여기서만 쓰므로 앱 import 시점에 불러오지 않는다 (C 로더가 있으면 사용)
+    import yaml
+
+    if raw is None:
+        with open(OPENAPI_YAML, "rb") as f:
+            raw = f.read()
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(raw, Loader=loader)
+
+
+def accepts_gzip(header):
+    # Accept-Encoding 의 q 값을 따른다: "gzip;q=0" 은 거부, 목록에 없으면 "*" 의 q 값
+    qualities = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding] = q
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+class Artifact:
+    __slots__ = ("body", "gzipped", "etag", "gzip_etag", "media_type")
+
+    def __init__(self, body, media_type):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # 강한 ETag 는 표현(인코딩)마다 달라야 한다
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+        self.media_type = media_type
+
+    def response(self, request):
+        gzipped = accepts_gzip(request.headers.get("accept-encoding", ""))
+        etag = self.gzip_etag if gzipped else self.etag
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+        body = self.body
+        if gzipped:
+            body = self.gzipped
+            headers["Content-Encoding"] = "gzip"
+        return Response(body, media_type=self.media_type, headers=headers)
+
+
+class OpenAPIDocs:
+    # openapi.yaml 을 한 번만 읽어 YAML/JSON 응답 바이트(gzip 포함)와 ETag 를 미리 만든다.
+    # 앱 시작 시 백그라운드 스레드에서 준비하므로 시작도, 첫 요청도 YAML 파싱을
+    # 기다리지 않는다(준비가 끝나기 전에 온 요청만 완료를 기다린다).
+    # cache_dir 를 지정하면 파싱 결과를 YAML 내용 해시를 이름으로 한 JSON 파일에 저장해 두고,
+    # 다음 시작부터는 YAML 대신 그 파일을 읽는다. 남이 심어 둔 파일을 내보내지 않도록
+    # 디렉터리와 파일이 내 소유이고 그룹/기타 쓰기 권한이 없을 때만 사용한다.
+
+    def __init__(self, path, cache_dir):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.schema = None
+        self.yaml = None
+        self.json = None
+        self.load_ms = 0.0
+        self.from_cache = False
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = None
+
+    def _cache_path(self, digest):
+        if not self.cache_dir:
+            return None
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        except OSError:
+            logger.warning("could not create OpenAPI cache dir %s", self.cache_dir)
+            return None
+        if not _private(self.cache_dir, stat.S_ISDIR):
+            logger.warning("ignoring OpenAPI cache dir %s: not private", self.cache_dir)
+            return None
+        return os.path.join(self.cache_dir, f"{_CACHE_PREFIX}{digest[:16]}.json")
+
+    def _load_json(self, raw):
+        cache_path = self._cache_path(hashlib.sha256(raw).hexdigest())
+        if cache_path and _private(cache_path, stat.S_ISREG):
+            try:
+                with open(cache_path, "rb") as f:
+                    body = f.read()
+                self.from_cache = True
+                return json.loads(body), body
+            except (OSError, ValueError):
+                pass
+        schema = load_openapi_schema(raw)
+        body = json.dumps(schema, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        if cache_path:
+            self._store(cache_path, body)
+        return schema, body
+
+    def _store(self, cache_path, body):
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp, cache_path)
+        except OSError:
+            logger.warning("could not write OpenAPI cache %s", cache_path)
+            return
+        # 이전 버전(다른 해시)의 파일은 다시 쓰이지 않으므로 지운다
+        current = os.path.basename(cache_path)
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(_CACHE_PREFIX) and name != current:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def load(self):
+        start = time.perf_counter()
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            self.schema, body = self._load_json(raw)
+            self.yaml = Artifact(raw, "text/plain; charset=utf-8")
+            self.json = Artifact(body, "application/json")
+        except Exception as exc:
+            self._error = exc
+            raise
+        finally:
+            self.load_ms = (time.perf_counter() - start) * 1000
+            self._ready.set()
+
+    def start(self):
+        if self._thread is None and not self._ready.is_set():
+            self._thread = threading.Thread(
+                target=self._run, name="sns-openapi-load", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        try:
+            self.load()
+        except Exception:
+            logger.exception("failed to load %s", self.path)
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait(self):
+        if not self._ready.is_set():
+            if self._thread is None:
+                self.load()
+            self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stats(self):
+        return {
+            "ready": self.ready,
+            "fromCache": self.from_cache,
+            "loadMs": self.load_ms,
+            "yamlBytes": len(self.yaml.body) if self.yaml else 0,
+            "jsonBytes": len(self.json.body) if self.json else 0,
+        }
+
+
+_CACHE_PREFIX = "sns-openapi-"
+
+
+def _private(path, is_kind):
+    # 심볼릭 링크가 아닌 해당 종류이고, 내 소유이며 그룹/기타가 쓸 수 없어야 한다
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not is_kind(st.st_mode):
+        return False
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        return False
+    return not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+docs = OpenAPIDocs(OPENAPI_YAML, config.OPENAPI_CACHE_DIR)
 
 
 def register_openapi(app):
-    _openapi_schema = {"schema": None}
+    app.add_event_handler("startup", docs.start)
+    swagger_html = get_swagger_ui_html(
+        openapi_url="/openapi.json", title="API Docs"
+    ).body
 
-    @app.get("/openapi.yaml", response_class=PlainTextResponse)
-    def openapi_yaml():
-        with open(OPENAPI_YAML, "r", encoding="utf-8") as f:
-            return f.read()
+    @app.get("/openapi.yaml", include_in_schema=False)
+    async def openapi_yaml(request: Request):
+        return (await _ready()).yaml.response(request)
 
-    @app.get("/", response_class=HTMLResponse)
-    def root_swagger():
-        return get_swagger_ui_html(openapi_url="/openapi.json", title="API Docs")
+    @app.get("/openapi.json", include_in_schema=False)
+    async def openapi_json(request: Request):
+        return (await _ready()).json.response(request)
+
+    @app.get("/", include_in_schema=False)
+    async def root_swagger():
+        return HTMLResponse(swagger_html)
 
     def custom_openapi():
-        if _openapi_schema["schema"] is not None:
-            return _openapi_schema["schema"]
-        _openapi_schema["schema"] = load_openapi_schema()
-        return _openapi_schema["schema"]
+        return docs.wait().schema
 
     app.openapi = custom_openapi
+
+
+async def _ready():
+    # 대부분 이미 준비된 상태라 즉시 반환; 시작 직후라면 스레드에서 완료를 기다린다
+    if docs.ready:
+        return docs.wait()
+    return await run_in_threadpool(docs.wait)
@@ -0,0 +1,193 @@
+import asyncio
+import signal
+import threading
+from collections import deque
+
+import config
+from responses import dumps
+
+
+class Subscriber:
+    # 구독자 하나의 상태. 대기 중인 구독자에게 태스크나 타이머를 따로 두지 않고
+    # 이벤트가 오거나 하트비트 때만 깨우는 Future 하나만 가지므로 수만 명도 가볍다.
+    __slots__ = ("queue", "waiter", "dropped", "closed")
+
+    def __init__(self):
+        self.queue = deque()
+        self.waiter = None
+        self.dropped = 0
+        self.closed = False
+
+    def _wake(self):
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    async def wait(self):
+        # 보낼 이벤트가 있거나, 끊겼거나, 하트비트 시각이 될 때까지 기다린다
+        if self.queue or self.closed:
+            return
+        self.waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self.waiter
+        finally:
+            self.waiter = None
+
+    def drain(self):
+        # 쌓인 이벤트를 한 번에 꺼낸다. 버려진 이벤트가 있으면 dropped 이벤트를 앞에 붙여
+        # 클라이언트가 목록을 다시 읽어야 한다는 것을 알린다.
+        chunks = []
+        if self.dropped:
+            chunks.append(_encode("dropped", {"count": self.dropped}))
+            self.dropped = 0
+        chunks.extend(self.queue)
+        self.queue.clear()
+        return b"".join(chunks)
+
+
+def _encode(event, data):
+    # SSE 메시지 하나. 구독자 수와 관계없이 발행할 때 한 번만 직렬화한다
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class EventBus:
+    # 프로세스 내 발행/구독 버스. 발행과 구독 모두 이벤트 루프 스레드에서만 일어나므로 락이 없다.
+    # 구독자 큐는 queue_size 로 제한하며, 느린 구독자가 넘치면 policy 에 따라
+    #   drop: 가장 오래된 이벤트부터 버리고 개수를 세어 두었다가 dropped 이벤트로 알림
+    #   disconnect: 연결을 끊음 (클라이언트는 재접속해 목록을 다시 읽는다)
+
+    def __init__(self, queue_size, policy, max_subscribers, heartbeat):
+        self.queue_size = queue_size
+        self.policy = policy
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self._subscribers = set()
+        self._ticker = None
+        # 서버 종료가 시작되면 새 구독을 받지 않는다
+        self.closing = False
+        # 다중 워커면 EventRelay 가 붙어 다른 워커에도 이벤트를 넘긴다 (relay.py)
+        self.relay = None
+        self.published = 0
+        self.dropped = 0
+        self.disconnected = 0
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        if self.closing or len(self._subscribers) >= self.max_subscribers:
+            return None
+        subscriber = Subscriber()
+        self._subscribers.add(subscriber)
+        if self._ticker is None and self.heartbeat > 0:
+            self._ticker = asyncio.get_running_loop().call_later(
+                self.heartbeat, self._tick
+            )
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.discard(subscriber)
+        subscriber.closed = True
+
+    def _tick(self):
+        # 구독자마다 타이머를 두는 대신 타이머 하나로 모두를 깨워 하트비트를 보내게 한다
+        for subscriber in self._subscribers:
+            subscriber._wake()
+        self._ticker = None
+        if self._subscribers:
+            self._ticker = asyncio.get_running_loop().call_later(
+                self.heartbeat, self._tick
+            )
+
+    def publish(self, event, data):
+        if self.relay is not None:
+            self.relay.send(event, data)
+        self.deliver(event, data)
+
+    def deliver(self, event, data):
+        # 이 프로세스의 구독자에게만 전달 (다른 워커에서 중계된 이벤트도 여기로 온다)
+        if not self._subscribers:
+            return
+        self.published += 1
+        message = _encode(event, data)
+        slow = []
+        for subscriber in self._subscribers:
+            if len(subscriber.queue) >= self.queue_size:
+                if self.policy == "disconnect":
+                    slow.append(subscriber)
+                    continue
+                subscriber.queue.popleft()
+                subscriber.dropped += 1
+                self.dropped += 1
+            subscriber.queue.append(message)
+            subscriber._wake()
+        for subscriber in slow:
+            self.unsubscribe(subscriber)
+            subscriber.queue.clear()
+            self.disconnected += 1
+            subscriber._wake()
+
+    def open(self):
+        self.closing = False
+
+    def close_all(self):
+        self.closing = True
+        for subscriber in list(self._subscribers):
+            self.unsubscribe(subscriber)
+            subscriber._wake()
+
+    def stats(self):
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "disconnected": self.disconnected,
+            "queueSize": self.queue_size,
+            "policy": self.policy,
+            "relay": self.relay.stats() if self.relay is not None else None,
+        }
+
+
+bus = EventBus(
+    config.EVENTS_QUEUE_SIZE,
+    config.EVENTS_SLOW_POLICY,
+    config.EVENTS_MAX_SUBSCRIBERS,
+    config.EVENTS_HEARTBEAT,
+)
+
+
+async def close_on_exit_signal():
+    # uvicorn 은 열린 연결이 모두 끝난 뒤에야 lifespan shutdown 을 실행하므로, 끝나지 않는
+    # SSE 스트림이 있으면 종료가 멈춘다. 시작 시 uvicorn 의 SIGINT/SIGTERM 처리기 앞에
+    # 끼어들어, 종료 신호를 받는 즉시 모든 스트림을 끝내게 한다.
+    # (처리기는 uvicorn 이 종료 후 원래대로 되돌린다. 메인 스레드에서만 설치할 수 있다)
+    bus.open()
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(bus.close_all)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+
+async def sse_events(subscriber):
+    # StreamingResponse 본문. 클라이언트가 끊으면 Starlette 가 이 제너레이터를 취소하고,
+    # finally 에서 구독을 해제한다.
+    try:
+        yield b": connected\n\n"
+        while True:
+            await subscriber.wait()
+            if subscriber.queue or subscriber.dropped:
+                yield subscriber.drain()
+            elif subscriber.closed:
+                return
+            else:
+                yield b": ping\n\n"
+    finally:
+        bus.unsubscribe(subscriber)
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import deque
+
+import config
+from pubsub import bus
+from responses import dumps
+
+logger = logging.getLogger(__name__)
+
+
+def relay_path(path):
+    # sns_api.db -> sns_api.events.db (DB 와 같은 디렉터리, 샤딩해도 하나)
+    root, ext = os.path.splitext(path)
+    return f"{root}.events{ext or '.db'}"
+
+
+class EventRelay:
+    # 워커 간 이벤트 전달. 같은 DB 를 쓰는 워커들이 이벤트 전용 SQLite 파일 하나를 공유한다.
+    # 버스가 발행한 이벤트는 outbox 에 모았다가 백그라운드 스레드가 주기마다 한 트랜잭션으로
+    # 추가하고(요청은 기다리지 않음), 같은 주기에 다른 워커가 추가한 행을 읽어 이벤트 루프에서
+    # 로컬 구독자에게만 전달한다(다시 중계하지 않음). 지연은 최대 두 주기 정도다.
+    # 시작 시점 이후의 이벤트만 전달하며, 오래된 행은 retain 건만 남기고 지운다.
+
+    def __init__(self, path, interval, retain):
+        self.path = path
+        self.interval = interval
+        self.retain = retain
+        self.origin = os.urandom(8).hex()
+        self.sent = 0
+        self.received = 0
+        self._outbox = deque()
+        self._loop = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def send(self, event, data):
+        # 이벤트 루프 스레드에서 호출 (deque 의 append/popleft 는 스레드 안전)
+        self._outbox.append((event, dumps(data).decode()))
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path, timeout=config.DB_BUSY_TIMEOUT, check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "seq INTEGER PRIMARY KEY, origin TEXT NOT NULL, "
+            "event TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        conn.commit()
+        return conn
+
+    def _flush(self, conn):
+        batch = []
+        while self._outbox:
+            batch.append((self.origin, *self._outbox.popleft()))
+        if batch:
+            conn.executemany(
+                "INSERT INTO events (origin, event, data) VALUES (?,?,?)", batch
+            )
+            conn.commit()
+            self.sent += len(batch)
+
+    def _poll(self, conn, last):
+        rows = conn.execute(
+            "SELECT seq, origin, event, data FROM events WHERE seq > ? ORDER BY seq",
+            (last,),
+        ).fetchall()
+        if not rows:
+            return last
+        foreign = [
+            (event, json.loads(data))
+            for _, origin, event, data in rows
+            if origin != self.origin
+        ]
+        if foreign:
+            self.received += len(foreign)
+            self._loop.call_soon_threadsafe(_deliver, foreign)
+        return rows[-1][0]
+
+    def _prune(self, conn, last):
+        conn.execute("DELETE FROM events WHERE seq <= ?", (last - self.retain,))
+        conn.commit()
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            (last,) = conn.execute(
+                "SELECT coalesce(max(seq), 0) FROM events"
+            ).fetchone()
+            ticks = 0
+            while not self._stop.wait(self.interval):
+                try:
+                    self._flush(conn)
+                    last = self._poll(conn, last)
+                    ticks += 1
+                    if ticks % 100 == 0:
+                        self._prune(conn, last)
+                except Exception:
+                    logger.exception("event relay failed")
+            # 종료 직전에 발행된 이벤트도 다른 워커에 넘긴다
+            self._flush(conn)
+        finally:
+            conn.close()
+
+    async def start(self):
+        if self._thread is None:
+            self._loop = asyncio.get_running_loop()
+            self._stop.clear()
+            bus.relay = self
+            self._thread = threading.Thread(
+                target=self._run, name="sns-event-relay", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            if bus.relay is self:
+                bus.relay = None
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "sent": self.sent,
+            "received": self.received,
+            "pending": len(self._outbox),
+        }
+
+
+def _deliver(events):
+    for event, data in events:
+        bus.deliver(event, data)
+
+
+relay = EventRelay(
+    relay_path(config.DB_PATH), config.DB_WATCH_INTERVAL, config.EVENTS_RELAY_RETAIN
+)
@@ -0,0 +1,767 @@
+import heapq
+import json
+import sqlite3
+import zlib
+from collections import Counter
+
+import config
+from db import pool, init_db
+from likes import LikeAggregator
+from utils import (
+    iso_now,
+    new_id,
+    row_to_post,
+    row_to_comment,
+    encode_cursor,
+    decode_cursor,
+    not_found,
+    bad_request,
+    item_result,
+    search_terms,
+    search_cursor,
+)
+
+POST_COLUMNS = "id,username,content,createdAt,updatedAt,likes,commentsCount"
+COMMENT_COLUMNS = "id,postId,username,content,createdAt,updatedAt"
+
+# IN (...) 한 번에 넣는 바인딩 변수 수
+_IN_CHUNK = 500
+
+
+def _existing_post_ids(c, post_ids):
+    found = set()
+    post_ids = list(post_ids)
+    for i in range(0, len(post_ids), _IN_CHUNK):
+        chunk = post_ids[i : i + _IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        c.execute(f"SELECT id FROM posts WHERE id IN ({marks})", chunk)
+        found.update(r[0] for r in c.fetchall())
+    return found
+
+
+def shard_of(post_id, count):
+    # 프로세스/재시작과 무관하게 같은 값이 나와야 하므로 hash() 대신 crc32
+    return zlib.crc32(post_id.encode("utf-8")) % count
+
+
+def _search_sql(fts, table, columns):
+    # FTS 색인에서 상위 N 건의 rowid 만 고른 뒤 원본 행과 조인한다. 행은 (rank, 잘림 여부, 열...).
+    # 흔한 단어는 일치 행 전체에 bm25 를 계산하면 수백 ms 가 걸리므로,
+    # SEARCH_MAX_CANDIDATES 가 있으면 최근(rowid 가 큰) 후보 N 건 안에서만 순위를 매긴다.
+    # 후보를 한 건 더 읽어 그보다 오래된 일치 행이 있었는지(잘림)를 같은 문장에서 알아낸다.
+    cap = config.SEARCH_MAX_CANDIDATES
+    columns = ",".join("t." + col for col in columns.split(","))
+    if cap:
+        return (
+            f"WITH c AS (SELECT rowid, bm25({fts}) AS rank FROM {fts} "
+            f"WHERE {fts} MATCH ? ORDER BY rowid DESC LIMIT {cap + 1}), "
+            "n AS (SELECT count(*) AS total, min(rowid) AS oldest FROM c) "
+            f"SELECT f.rank, f.truncated, {columns} FROM ("
+            f"SELECT c.rowid, c.rank, n.total > {cap} AS truncated FROM c, n "
+            f"WHERE n.total <= {cap} OR c.rowid > n.oldest ORDER BY c.rank LIMIT ?) f "
+            f"JOIN {table} t ON t.rowid = f.rowid ORDER BY f.rank"
+        )
+    ranked = f"SELECT rowid, rank FROM {fts} WHERE {fts} MATCH ? ORDER BY rank LIMIT ?"
+    return (
+        f"SELECT f.rank, 0, {columns} FROM ({ranked}) f "
+        f"JOIN {table} t ON t.rowid = f.rowid ORDER BY f.rank"
+    )
+
+
+_SEARCH_SOURCES = (
+    (
+        "posts",
+        _search_sql("posts_fts", "posts", POST_COLUMNS),
+        "post",
+        row_to_post,
+    ),
+    (
+        "comments",
+        _search_sql("comments_fts", "comments", COMMENT_COLUMNS),
+        "comment",
+        row_to_comment,
+    ),
+)
+
+# 묶음 조회: 게시물 ID 목록은 JSON 배열 하나로 바인딩한다 (IN 절 분할 불필요)
+_POSTS_BY_IDS = (
+    f"SELECT {POST_COLUMNS} FROM posts WHERE id IN (SELECT value FROM json_each(?))"
+)
+# 게시물마다 앞쪽 댓글 N 건. 창 함수(ROW_NUMBER OVER PARTITION BY postId)는 각 게시물의
+# 댓글을 전부 읽어야 해서 댓글이 많은 게시물에서 느려지므로, 게시물별로 인덱스를
+# LIMIT 만큼만 읽는 상관 서브쿼리를 쓴다. 게시물 수와 관계없이 문장은 하나다.
+_EMBED_COMMENTS = (
+    f"SELECT {', '.join('c.' + col for col in COMMENT_COLUMNS.split(','))} "
+    "FROM json_each(?) AS ids JOIN comments c ON c.rowid IN ("
+    "SELECT rowid FROM comments WHERE postId = ids.value "
+    "ORDER BY createdAt, id LIMIT ?) "
+    "ORDER BY c.postId, c.createdAt, c.id"
+)
+_LIKED_BY = (
+    "SELECT postId FROM likes "
+    "WHERE username=? AND postId IN (SELECT value FROM json_each(?))"
+)
+
+
+# 좋아요에는 시각이 없으므로 idx_likes_username 순서(postId)로 페이지를 나눈다.
+# 새 게시물 ID 는 시간순(UUIDv7)이라 대체로 최근 게시물부터 나온다.
+_USER_LIKES = (
+    f"SELECT {', '.join('p.' + col for col in POST_COLUMNS.split(','))} "
+    "FROM likes l JOIN posts p ON p.id = l.postId "
+    "WHERE l.username=? {where} ORDER BY l.postId DESC LIMIT ?"
+)
+
+
+def next_page(items, limit, key):
+    # limit + 1 건을 읽은 결과를 한 페이지와 다음 커서로 나눈다
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(*key(items[-1]))
+
+
+def attach_embeds(posts, comments_limit, comments_of, liked):
+    # comments_of: 게시물 ID -> 앞쪽 댓글 (comments_limit + 1 건까지), liked: 좋아요한 게시물 ID 집합
+    for post in posts:
+        if comments_limit is not None:
+            comments = comments_of.get(post["id"], [])
+            next_cursor = None
+            if len(comments) > comments_limit:
+                comments = comments[:comments_limit]
+                next_cursor = encode_cursor(
+                    comments[-1]["createdAt"], comments[-1]["id"]
+                )
+            post["comments"] = comments
+            post["commentsNextCursor"] = next_cursor
+        if liked is not None:
+            post["liked"] = post["id"] in liked
+    return posts
+
+
+class Repository:
+    # 게시물/댓글/좋아요 저장소 인터페이스. 모든 메서드는 블로킹 호출이므로
+    # 라우트에서는 db.run_db 를 통해 DB 전용 스레드에서 실행한다.
+    # 없는 대상은 not_found(), 잘못된 요청은 bad_request() 를 raise 하고,
+    # 목록은 (항목 목록, 다음 커서) 를 돌려준다. 백엔드는 SNS_BACKEND 로 고른다.
+
+    # 미반영 좋아요 집계기 (SQLite 백엔드의 write-behind 모드에서만 사용)
+    likes = None
+    # 사용하는 커넥션 풀 (진단 엔드포인트, 다중 워커 변경 감시용)
+    pools = ()
+
+    def start(self):
+        pass
+
+    def close(self):
+        pass
+
+    def list_posts(self, limit, cursor=None):
+        raise NotImplementedError
+
+    def create_post(self, username, content):
+        raise NotImplementedError
+
+    def get_post(self, post_id):
+        raise NotImplementedError
+
+    def update_post(self, post_id, username, content):
+        raise NotImplementedError
+
+    def delete_post(self, post_id):
+        raise NotImplementedError
+
+    def list_comments(self, post_id, limit, after=None):
+        raise NotImplementedError
+
+    def create_comment(self, post_id, username, content):
+        raise NotImplementedError
+
+    def get_comment(self, post_id, comment_id):
+        raise NotImplementedError
+
+    def update_comment(self, post_id, comment_id, username, content):
+        raise NotImplementedError
+
+    def delete_comment(self, post_id, comment_id):
+        raise NotImplementedError
+
+    def like_post(self, post_id, username):
+        raise NotImplementedError
+
+    def unlike_post(self, post_id, username):
+        raise NotImplementedError
+
+    def bulk_create_posts(self, items):
+        raise NotImplementedError
+
+    def bulk_create_comments(self, items):
+        raise NotImplementedError
+
+    def bulk_like(self, items):
+        raise NotImplementedError
+
+    def search(self, q, kind, limit, cursor=None):
+        # (결과, 다음 커서, 후보 제한 때문에 일부 일치 행을 보지 않았는지)
+        raise NotImplementedError
+
+    def list_user_posts(self, username, limit, cursor=None):
+        # 사용자의 게시물, 최신순 (createdAt, id) 키셋 커서
+        raise NotImplementedError
+
+    def list_user_comments(self, username, limit, cursor=None):
+        # 사용자의 댓글, 최신순 (createdAt, id) 키셋 커서
+        raise NotImplementedError
+
+    def list_user_likes(self, username, limit, cursor=None):
+        # 사용자가 좋아요한 게시물, 게시물 ID 내림차순 (postId) 키셋 커서
+        raise NotImplementedError
+
+    def get_posts(self, post_ids):
+        # 있는 게시물만 요청한 순서대로 돌려준다
+        raise NotImplementedError
+
+    def recent_engagement(self, limit):
+        # 최근 게시물 limit 건의 (id, 좋아요 수, 댓글 수, createdAt). 인기 순위 초기화용
+        raise NotImplementedError
+
+    def embed(self, posts, comments_limit=None, liked_by=None):
+        # 게시물 목록에 앞쪽 댓글(comments, commentsNextCursor)과
+        # liked_by 사용자의 좋아요 여부(liked)를 붙인다. 게시물 수와 관계없이 쿼리 수는 고정
+        raise NotImplementedError
+
+    def like_stats(self):
+        # 미반영 좋아요 집계 상태 (집계를 쓰지 않으면 None)
+        return self.likes.stats() if self.likes is not None else None
+
+
+class SqliteRepository(Repository):
+    def __init__(self, pool, likes=None, shard=None):
+        self.pool = pool
+        self.pools = (pool,)
+        # LikeAggregator 가 있으면 posts.likes 갱신을 모아서 나중에 반영한다
+        self.likes = likes
+        # 샤드의 일부라면 (번호, 샤드 수): 새 게시물 ID 가 이 샤드로 라우팅되게 만든다
+        self.shard = shard
+
+    def _new_post_id(self):
+        id_ = new_id()
+        if self.shard is not None:
+            index, count = self.shard
+            while shard_of(id_, count) != index:
+                id_ = new_id()
+        return id_
+
+    def start(self):
+        init_db(self.pool)
+        if self.likes is not None:
+            self.likes.start()
+
+    def close(self):
+        if self.likes is not None:
+            self.likes.stop()
+
+    def _read_posts(self, read, posts_of=None):
+        # read() 가 돌려준 게시물 목록에 아직 반영되지 않은 좋아요 증감분을 더한다
+        # (결과가 게시물 목록이 아니면 posts_of 로 그 안의 게시물을 꺼낸다)
+        if self.likes is None:
+            return read()
+
+        def read_with_pending():
+            result = read()
+            for post in posts_of(result) if posts_of else result:
+                post["likes"] += self.likes.pending(post["id"])
+            return result
+
+        return self.likes.read_consistent(read_with_pending)
+
+    # 게시물
+
+    def list_posts(self, limit, cursor=None):
+        def read():
+            with self.pool.connection() as conn:
+                c = conn.cursor()
+                # 다음 페이지 존재 여부를 알기 위해 limit + 1 행을 읽는다
+                if cursor:
+                    created_at, id_ = decode_cursor(cursor, str, str)
+                    c.execute(
+                        f"SELECT {POST_COLUMNS} FROM posts "
+                        "WHERE (createdAt, id) < (?, ?) ORDER BY createdAt DESC, id DESC LIMIT ?",
+                        (created_at, id_, limit + 1),
+                    )
+                else:
+                    c.execute(
+                        f"SELECT {POST_COLUMNS} FROM posts "
+                        "ORDER BY createdAt DESC, id DESC LIMIT ?",
+                        (limit + 1,),
+                    )
+                return [row_to_post(r) for r in c.fetchall()]
+
+        posts = self._read_posts(read)
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            next_cursor = encode_cursor(posts[-1]["createdAt"], posts[-1]["id"])
+        return posts, next_cursor
+
+    def create_post(self, username, content):
+        id_ = self._new_post_id()
+        now = iso_now()
+        with self.pool.connection() as conn:
+            conn.execute(
+                "INSERT INTO posts (id,username,content,createdAt,likes,commentsCount) VALUES (?,?,?,?,?,?)",
+                (id_, username, content, now, 0, 0),
+            )
+            conn.commit()
+        return {
+            "id": id_,
+            "username": username,
+            "content": content,
+            "createdAt": now,
+            "updatedAt": None,
+            "likes": 0,
+            "commentsCount": 0,
+        }
+
+    def _select_post(self, post_id):
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                f"SELECT {POST_COLUMNS} FROM posts WHERE id=?", (post_id,)
+            ).fetchone()
+        return [row_to_post(row)] if row else []
+
+    def get_post(self, post_id):
+        posts = self._read_posts(lambda: self._select_post(post_id))
+        if not posts:
+            raise not_found()
+        return posts[0]
+
+    def update_post(self, post_id, username, content):
+        now = iso_now()
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "UPDATE posts SET username=?, content=?, updatedAt=? WHERE id=? "
+                f"RETURNING {POST_COLUMNS}",
+                (username, content, now, post_id),
+            ).fetchall()
+            if not rows:
+                raise not_found()
+            conn.commit()
+        if self.likes is not None:
+            # 미반영 좋아요 증감분과 일관되게 다시 읽는다
+            return self._read_posts(lambda: self._select_post(post_id))[0]
+        return row_to_post(rows[0])
+
+    def delete_post(self, post_id):
+        with self.pool.connection() as conn:
+            c = conn.cursor()
+            c.execute("DELETE FROM posts WHERE id=?", (post_id,))
+            if not c.rowcount:
+                raise not_found()
+            c.execute("DELETE FROM comments WHERE postId=?", (post_id,))
+            c.execute("DELETE FROM likes WHERE postId=?", (post_id,))
+            conn.commit()
+
+    # 댓글
+
+    def list_comments(self, post_id, limit, after=None):
+        with self.pool.connection() as conn:
+            c = conn.cursor()
+            # 게시물 존재 확인과 댓글 조회를 LEFT JOIN 한 번으로 처리
+            if after:
+                created_at, id_ = decode_cursor(after, str, str)
+                c.execute(
+                    "SELECT p.id,c.id,c.postId,c.username,c.content,c.createdAt,c.updatedAt "
+                    "FROM posts p LEFT JOIN comments c "
+                    "ON c.postId = p.id AND (c.createdAt, c.id) > (?, ?) "
+                    "WHERE p.id=? ORDER BY c.createdAt, c.id LIMIT ?",
+                    (created_at, id_, post_id, limit + 1),
+                )
+            else:
+                c.execute(
+                    "SELECT p.id,c.id,c.postId,c.username,c.content,c.createdAt,c.updatedAt "
+                    "FROM posts p LEFT JOIN comments c ON c.postId = p.id "
+                    "WHERE p.id=? ORDER BY c.createdAt, c.id LIMIT ?",
+                    (post_id, limit + 1),
+                )
+            rows = c.fetchall()
+        if not rows:
+            raise not_found()
+        rows = [r[1:] for r in rows if r[1] is not None]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][4], rows[-1][0])
+        return [row_to_comment(r) for r in rows], next_cursor
+
+    def create_comment(self, post_id, username, content):
+        id_ = new_id()
+        now = iso_now()
+        with self.pool.connection() as conn:
+            c = conn.cursor()
+            # 카운터 갱신의 rowcount 로 게시물 존재를 확인 (별도 SELECT 없음)
+            c.execute(
+                "UPDATE posts SET commentsCount = commentsCount + 1 WHERE id=?",
+                (post_id,),
+            )
+            if not c.rowcount:
+                raise not_found()
+            c.execute(
+                "INSERT INTO comments (id,postId,username,content,createdAt) VALUES (?,?,?,?,?)",
+                (id_, post_id, username, content, now),
+            )
+            conn.commit()
+        return {
+            "id": id_,
+            "postId": post_id,
+            "username": username,
+            "content": content,
+            "createdAt": now,
+            "updatedAt": None,
+        }
+
+    def get_comment(self, post_id, comment_id):
+        # 게시물이 없으면 댓글도 없으므로 한 번의 조회로 충분하다
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                f"SELECT {COMMENT_COLUMNS} FROM comments WHERE id=? AND postId=?",
+                (comment_id, post_id),
+            ).fetchone()
+        if not row:
+            raise not_found()
+        return row_to_comment(row)
+
+    def update_comment(self, post_id, comment_id, username, content):
+        now = iso_now()
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "UPDATE comments SET username=?, content=?, updatedAt=? WHERE id=? AND postId=? "
+                f"RETURNING {COMMENT_COLUMNS}",
+                (username, content, now, comment_id, post_id),
+            ).fetchall()
+            if not rows:
+                raise not_found()
+            conn.commit()
+        return row_to_comment(rows[0])
+
+    def delete_comment(self, post_id, comment_id):
+        with self.pool.connection() as conn:
+            c = conn.cursor()
+            c.execute(
+                "DELETE FROM comments WHERE id=? AND postId=?", (comment_id, post_id)
+            )
+            if not c.rowcount:
+                raise not_found()
+            c.execute(
+                "UPDATE posts SET commentsCount = commentsCount - 1 WHERE id=?",
+                (post_id,),
+            )
+            conn.commit()
+
+    # 좋아요
+
+    def like_post(self, post_id, username):
+        if self.likes is not None:
+            return self._like_post_aggregated(post_id, username)
+        with self.pool.connection() as conn:
+            c = conn.cursor()
+            self._insert_like(c, post_id, username)
+            total = c.execute(
+                "UPDATE posts SET likes = likes + 1 WHERE id=? RETURNING likes",
+                (post_id,),
+            ).fetchall()[0][0]
+            conn.commit()
+        return total
+
+    def unlike_post(self, post_id, username):
+        if self.likes is not None:
+            return self._unlike_post_aggregated(post_id, username)
+        with self.pool.connection() as conn:
+            c = conn.cursor()
+            self._delete_like(c, post_id, username)
+            c.execute("UPDATE posts SET likes = likes - 1 WHERE id=?", (post_id,))
+            conn.commit()
+
+    def _insert_like(self, c, post_id, username):
+        # 게시물이 없으면 0행 삽입(404), 이미 눌렀으면 PK 위반(400)
+        try:
+            c.execute(
+                "INSERT INTO likes (postId, username) "
+                "SELECT ?, ? WHERE EXISTS (SELECT 1 FROM posts WHERE id=?)",
+                (post_id, username, post_id),
+            )
+        except sqlite3.IntegrityError:
+            raise bad_request()
+        if not c.rowcount:
+            raise not_found()
+
+    def _delete_like(self, c, post_id, username):
+        c.execute(
+            "DELETE FROM likes WHERE postId=? AND username=?", (post_id, username)
+        )
+        if not c.rowcount:
+            # 실패 경로에서만 게시물 존재 여부로 404/400 을 구분
+            c.execute("SELECT 1 FROM posts WHERE id=?", (post_id,))
+            raise bad_request() if c.fetchone() else not_found()
+
+    # 집계 모드: likes 행만 즉시 쓰고 posts.likes 증감은 LikeAggregator 로 넘긴다
+
+    def _stored_likes(self, c, post_id):
+        row = c.execute("SELECT likes FROM posts WHERE id=?", (post_id,)).fetchone()
+        return (row[0] if row else 0) + self.likes.pending(post_id)
+
+    def _like_post_aggregated(self, post_id, username):
+        with self.pool.connection() as conn:
+            c = conn.cursor()
+            self._insert_like(c, post_id, username)
+            conn.commit()
+            self.likes.add(post_id, 1)
+            return self.likes.read_consistent(lambda: self._stored_likes(c, post_id))
+
+    def _unlike_post_aggregated(self, post_id, username):
+        with self.pool.connection() as conn:
+            c = conn.cursor()
+            self._delete_like(c, post_id, username)
+            conn.commit()
+            self.likes.add(post_id, -1)
+
+    # 일괄 생성: 단일 트랜잭션, executemany, 카운터는 게시물별로 합산해 한 번씩 갱신
+
+    def bulk_create_posts(self, items):
+        rows = [
+            (self._new_post_id(), username, content, iso_now(), 0, 0)
+            for username, content in items
+        ]
+        with self.pool.connection() as conn:
+            conn.executemany(
+                "INSERT INTO posts (id,username,content,createdAt,likes,commentsCount) VALUES (?,?,?,?,?,?)",
+                rows,
+            )
+            conn.commit()
+        return [
+            item_result(201, row_to_post((r[0], r[1], r[2], r[3], None, 0, 0)))
+            for r in rows
+        ]
+
+    def bulk_create_comments(self, items):
+        with self.pool.connection() as conn:
+            c = conn.cursor()
+            existing = _existing_post_ids(c, {post_id for post_id, _, _ in items})
+            rows, results = [], []
+            for post_id, username, content in items:
+                if post_id not in existing:
+                    results.append(item_result(404))
+                    continue
+                row = (new_id(), post_id, username, content, iso_now(), None)
+                rows.append(row)
+                results.append(item_result(201, row_to_comment(row)))
+            c.executemany(
+                "INSERT INTO comments (id,postId,username,content,createdAt) VALUES (?,?,?,?,?)",
+                [r[:5] for r in rows],
+            )
+            counts = Counter(r[1] for r in rows)
+            c.executemany(
+                "UPDATE posts SET commentsCount = commentsCount + ? WHERE id=?",
+                [(n, post_id) for post_id, n in counts.items()],
+            )
+            conn.commit()
+        return results
+
+    def bulk_like(self, items):
+        with self.pool.connection() as conn:
+            c = conn.cursor()
+            existing = _existing_post_ids(c, {post_id for post_id, _ in items})
+            counts = Counter()
+            statuses = []
+            for post_id, username in items:
+                if post_id not in existing:
+                    statuses.append(404)
+                    continue
+                # 항목별 중복 여부가 필요하므로 같은 트랜잭션 안에서 한 건씩 실행
+                c.execute(
+                    "INSERT OR IGNORE INTO likes (postId, username) VALUES (?,?)",
+                    (post_id, username),
+                )
+                if c.rowcount:
+                    counts[post_id] += 1
+                    statuses.append(201)
+                else:
+                    statuses.append(400)
+            if self.likes is None:
+                c.executemany(
+                    "UPDATE posts SET likes = likes + ? WHERE id=?",
+                    [(n, post_id) for post_id, n in counts.items()],
+                )
+            conn.commit()
+            if self.likes is not None:
+                for post_id, n in counts.items():
+                    self.likes.add(post_id, n)
+            totals = self._read_like_totals(c, list(counts))
+        return [
+            item_result(
+                status,
+                {"postId": post_id, "username": username, "totalLikes": totals[post_id]}
+                if status == 201
+                else None,
+            )
+            for status, (post_id, username) in zip(statuses, items)
+        ]
+
+    def _read_like_totals(self, c, post_ids):
+        def read():
+            totals = {}
+            for i in range(0, len(post_ids), _IN_CHUNK):
+                chunk = post_ids[i : i + _IN_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                c.execute(f"SELECT id, likes FROM posts WHERE id IN ({marks})", chunk)
+                totals.update(c.fetchall())
+            if self.likes is not None:
+                for post_id in totals:
+                    totals[post_id] += self.likes.pending(post_id)
+            return totals
+
+        if self.likes is None:
+            return read()
+        return self.likes.read_consistent(read)
+
+    # 사용자별 목록 (username 인덱스, 최신순 키셋 페이지네이션)
+
+    def _user_page(self, table, columns, username, limit, cursor):
+        with self.pool.connection() as conn:
+            if cursor:
+                created_at, id_ = decode_cursor(cursor, str, str)
+                return conn.execute(
+                    f"SELECT {columns} FROM {table} "
+                    "WHERE username=? AND (createdAt, id) < (?, ?) "
+                    "ORDER BY createdAt DESC, id DESC LIMIT ?",
+                    (username, created_at, id_, limit + 1),
+                ).fetchall()
+            return conn.execute(
+                f"SELECT {columns} FROM {table} WHERE username=? "
+                "ORDER BY createdAt DESC, id DESC LIMIT ?",
+                (username, limit + 1),
+            ).fetchall()
+
+    def list_user_posts(self, username, limit, cursor=None):
+        def read():
+            rows = self._user_page("posts", POST_COLUMNS, username, limit, cursor)
+            return [row_to_post(r) for r in rows]
+
+        posts = self._read_posts(read)
+        return next_page(posts, limit, lambda p: (p["createdAt"], p["id"]))
+
+    def list_user_comments(self, username, limit, cursor=None):
+        rows = self._user_page("comments", COMMENT_COLUMNS, username, limit, cursor)
+        comments = [row_to_comment(r) for r in rows]
+        return next_page(comments, limit, lambda c: (c["createdAt"], c["id"]))
+
+    def list_user_likes(self, username, limit, cursor=None):
+        def read():
+            with self.pool.connection() as conn:
+                if cursor:
+                    (after,) = decode_cursor(cursor, str)
+                    rows = conn.execute(
+                        _USER_LIKES.format(where="AND l.postId < ?"),
+                        (username, after, limit + 1),
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        _USER_LIKES.format(where=""), (username, limit + 1)
+                    ).fetchall()
+            return [row_to_post(r) for r in rows]
+
+        posts = self._read_posts(read)
+        return next_page(posts, limit, lambda p: (p["id"],))
+
+    # 묶음 조회 / 임베드
+
+    def get_posts(self, post_ids):
+        def read():
+            with self.pool.connection() as conn:
+                rows = conn.execute(_POSTS_BY_IDS, (json.dumps(post_ids),)).fetchall()
+            return [row_to_post(r) for r in rows]
+
+        found = {post["id"]: post for post in self._read_posts(read)}
+        return [found[id_] for id_ in post_ids if id_ in found]
+
+    def recent_engagement(self, limit):
+        with self.pool.connection() as conn:
+            return conn.execute(
+                "SELECT id, likes, commentsCount, createdAt FROM posts "
+                "ORDER BY createdAt DESC, id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def embed(self, posts, comments_limit=None, liked_by=None):
+        if not posts:
+            return posts
+        ids = json.dumps([post["id"] for post in posts])
+        comments_of, liked = {}, None
+        with self.pool.connection() as conn:
+            if comments_limit is not None:
+                for row in conn.execute(_EMBED_COMMENTS, (ids, comments_limit + 1)):
+                    comments_of.setdefault(row[1], []).append(row_to_comment(row))
+            if liked_by is not None:
+                liked = {r[0] for r in conn.execute(_LIKED_BY, (liked_by, ids))}
+        return attach_embeds(posts, comments_limit, comments_of, liked)
+
+    # 전문 검색
+
+    def search(self, q, kind, limit, cursor=None):
+        # 모든 단어를 포함해야 일치. 입력 중인 마지막 단어만 접두어로 찾는다
+        # (앞 단어까지 접두어로 풀면 후보 목록이 커져 흔한 접두어에서 느려진다)
+        terms = [f'"{term}"' for term in search_terms(q)]
+        terms[-1] += "*"
+        query = " ".join(terms)
+        offset = search_cursor(cursor)
+        # 각 색인에서 상위 offset + limit + 1 건만 뽑아 rank 로 병합한다.
+        # rowid 로 원본 행을 찾는 조인은 뽑힌 행에만 일어난다.
+        wanted = offset + limit + 1
+
+        truncated = False
+
+        def read():
+            nonlocal truncated
+            truncated = False
+            sources = []
+            with self.pool.connection() as conn:
+                for name, sql, type_, to_dict in _SEARCH_SOURCES:
+                    if kind not in ("all", name):
+                        continue
+                    rows = conn.execute(sql, (query, wanted)).fetchall()
+                    sources.append([(r[0], type_, to_dict(r[2:])) for r in rows])
+                    # 후보 제한에 걸렸으면 순위/페이지가 최근 후보 안에서 끝났다고 알린다
+                    truncated = truncated or any(r[1] for r in rows[:1])
+            return list(heapq.merge(*sources, key=lambda hit: hit[0]))[offset:wanted]
+
+        hits = self._read_posts(
+            read, lambda hits: [data for _, type_, data in hits if type_ == "post"]
+        )
+        results = [
+            {"type": type_, "score": -rank, "data": data}
+            for rank, type_, data in hits[:limit]
+        ]
+        next_cursor = encode_cursor(offset + limit) if len(hits) > limit else None
+        return results, next_cursor, truncated
+
+
+def create_repository():
+    if config.BACKEND == "memory":
+        # 메모리 저장소는 프로세스마다 따로 생기므로 워커 간에 데이터가 갈라진다
+        if config.WORKERS > 1:
+            raise ValueError("SNS_BACKEND=memory cannot run with multiple workers")
+        from memory_repository import MemoryRepository
+
+        return MemoryRepository()
+    if config.BACKEND != "sqlite":
+        raise ValueError(f"unknown SNS_BACKEND: {config.BACKEND}")
+    if config.DB_SHARDS > 1:
+        from sharding import create_sharded_repository
+
+        return create_sharded_repository(config.DB_SHARDS)
+    likes = None
+    if config.LIKE_AGGREGATION:
+        likes = LikeAggregator(pool, config.LIKE_FLUSH_INTERVAL)
+    return SqliteRepository(pool, likes)
+
+
+repo = create_repository()
@@ -0,0 +1,25 @@
+import json
+
+from fastapi.responses import JSONResponse
+
+# orjson 이 있으면 사용하고, 없으면 표준 json 으로 동작한다 (선택 의존성)
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps(content):
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    # 라우트가 이 응답을 직접 돌려주면 FastAPI 의 jsonable_encoder 단계를 건너뛰고
+    # 저장소가 만든 dict/list 를 한 번에 바이트로 인코딩한다.
+
+    def render(self, content):
+        return dumps(content)
@@ -1,280 +1,448 @@
-import uuid
-import sqlite3
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
+import functools
+import re
+from collections import Counter
+from typing import List, Optional
 
-from db import get_conn
-from schemas import NewPost, NewComment, LikeRequest
-from utils import iso_now, row_to_post, row_to_comment
+from fastapi import APIRouter, Body, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+import config
+from cache import cache, post_tag, comments_tag, FEED_HEAD_TAG
+from db import run_db
+from pubsub import bus, sse_events
+from repository import repo
+from responses import FastJSONResponse
+from schemas import NewPost, NewComment, LikeRequest, BulkComment, BulkLike
+from streaming import wants_stream, stream_pages
+from trending import trending
+from utils import bad_request, service_unavailable, encode_cursor, search_cursor
+from versions import (
+    FEED,
+    COMMENTS,
+    post_key,
+    comments_key,
+    post_created,
+    post_changed,
+    comments_changed,
+    versions,
+    etag_matches,
+    not_modified,
+)
 
 router = APIRouter(prefix="/api")
 
 
+async def cached_read(key, tags_of, fn, *args):
+    # 캐시에 없으면 저장소에서 읽어 태그와 함께 저장
+    value = cache.get(key)
+    if value is None:
+        generation = cache.generation
+        value = await run_db(fn, *args)
+        cache.set(key, value, tags_of(value), generation)
+    return value
+
+
+def _page_response(items, next_cursor, etag=None):
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if etag:
+        headers["ETag"] = etag
+    return FastJSONResponse(items, headers=headers or None)
+
+
+def _created(content):
+    return FastJSONResponse(content, status_code=status.HTTP_201_CREATED)
+
+
+def _page_tags(cursor):
+    def tags_of(page):
+        tags = [post_tag(p["id"]) for p in page[0]]
+        if not cursor:
+            tags.append(FEED_HEAD_TAG)
+        return tags
+
+    return tags_of
+
+
+_INCLUDE = re.compile(r"comments(?:\(limit=(\d+)\))?")
+
+
+def _comments_include(include):
+    # include=comments 또는 include=comments(limit=k) -> 임베드할 댓글 수
+    if include is None:
+        return None
+    match = _INCLUDE.fullmatch(include)
+    if not match:
+        raise bad_request()
+    limit = int(match.group(1) or config.EMBED_COMMENTS_DEFAULT)
+    if not 1 <= limit <= config.PAGE_MAX_LIMIT:
+        raise bad_request()
+    return limit
+
+
+def _post_ids(ids):
+    post_ids = list(dict.fromkeys(id_ for id_ in ids.split(",") if id_))
+    if not post_ids or len(post_ids) > config.PAGE_MAX_LIMIT:
+        raise bad_request()
+    return post_ids
+
+
+def _with_embeds(read, comments_limit, liked_by):
+    # 게시물을 읽은 같은 DB 스레드에서 댓글/좋아요 여부를 덧붙인다.
+    # 게시물이 몇 건이든 쿼리는 게시물 1 + 댓글 1 + 좋아요 1 로 고정된다.
+    if comments_limit is None and liked_by is None:
+        return read
+
+    def read_embedded(*args):
+        posts, next_cursor = read(*args)
+        return repo.embed(posts, comments_limit, liked_by), next_cursor
+
+    return read_embedded
+
+
 @router.get("/posts")
-def list_posts():
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute(
-        "SELECT id,username,content,createdAt,updatedAt,likes,commentsCount FROM posts ORDER BY createdAt DESC"
-    )
-    rows = c.fetchall()
-    conn.close()
-    return [row_to_post(r) for r in rows]
+async def list_posts(
+    request: Request,
+    limit: int = Query(config.PAGE_DEFAULT_LIMIT, ge=1, le=config.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    ids: Optional[str] = None,
+    include: Optional[str] = None,
+    likedBy: Optional[str] = None,
+):
+    comments_limit = _comments_include(include)
+    embeds = comments_limit is not None or likedBy is not None
+    if ids is not None:
+        # 묶음 조회: 있는 게시물만 요청 순서대로, 페이지 없음
+        post_ids = _post_ids(ids)
+        keys = [post_key(id_) for id_ in post_ids]
+        if comments_limit is not None:
+            keys += [comments_key(id_) for id_ in post_ids]
+        etag = versions.etag(*keys, query=request.url.query)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        read = _with_embeds(
+            lambda: (repo.get_posts(post_ids), None), comments_limit, likedBy
+        )
+        posts, _ = await run_db(read)
+        return _page_response(posts, None, etag)
+    if wants_stream(request, stream):
+        return await stream_pages(
+            request, _with_embeds(repo.list_posts, comments_limit, likedBy), cursor
+        )
+    # 버전은 행을 읽기 전에 얻는다: 읽는 도중 바뀌면 다음 요청에서 200 이 된다
+    keys = [FEED, COMMENTS] if comments_limit is not None else [FEED]
+    etag = versions.etag(*keys, query=request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if embeds:
+        # 임베드한 페이지는 사용자별/댓글별로 달라지므로 캐시하지 않는다
+        posts, next_cursor = await run_db(
+            _with_embeds(repo.list_posts, comments_limit, likedBy), limit, cursor
+        )
+    else:
+        posts, next_cursor = await cached_read(
+            ("posts", limit, cursor), _page_tags(cursor), repo.list_posts, limit, cursor
+        )
+    return _page_response(posts, next_cursor, etag)
 
 
 @router.post("/posts", status_code=status.HTTP_201_CREATED)
-def create_post(payload: NewPost):
-    id_ = str(uuid.uuid4())
-    now = iso_now()
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO posts (id,username,content,createdAt,likes,commentsCount) VALUES (?,?,?,?,?,?)",
-        (id_, payload.username, payload.content, now, 0, 0),
+async def create_post(payload: NewPost):
+    post = await run_db(repo.create_post, payload.username, payload.content)
+    cache.invalidate_tags(FEED_HEAD_TAG)
+    post_created(post["id"])
+    bus.publish(
+        "post.created",
+        {
+            "postId": post["id"],
+            "username": post["username"],
+            "createdAt": post["createdAt"],
+        },
     )
-    conn.commit()
-    conn.close()
-    return {
-        "id": id_,
-        "username": payload.username,
-        "content": payload.content,
-        "createdAt": now,
-        "updatedAt": None,
-        "likes": 0,
-        "commentsCount": 0,
-    }
+    return _created(post)
 
 
-@router.get("/posts/{postId}")
-def get_post(postId: str):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute(
-        "SELECT id,username,content,createdAt,updatedAt,likes,commentsCount FROM posts WHERE id=?",
-        (postId,),
+@router.get("/posts/trending")
+async def trending_posts(
+    limit: int = Query(config.PAGE_DEFAULT_LIMIT, ge=1, le=config.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
+    likedBy: Optional[str] = None,
+):
+    # 메모리 순위에서 상위 ID 만 잘라 묶음 조회한다 (posts 전체를 정렬하지 않음).
+    # /posts/{postId} 보다 먼저 등록해야 "trending" 이 게시물 ID 로 잡히지 않는다.
+    offset = search_cursor(cursor)
+    post_ids, more = trending.top(limit, offset)
+    read = _with_embeds(
+        lambda: (repo.get_posts(post_ids), None), _comments_include(include), likedBy
     )
-    row = c.fetchone()
-    conn.close()
-    if not row:
-        raise HTTPException(
-            status_code=404, detail={"code": 404, "message": "Not found"}
+    posts, _ = await run_db(read) if post_ids else ([], None)
+    return _page_response(posts, encode_cursor(offset + limit) if more else None)
+
+
+@router.get("/posts/{postId}")
+async def get_post(
+    postId: str,
+    request: Request,
+    include: Optional[str] = None,
+    likedBy: Optional[str] = None,
+):
+    comments_limit = _comments_include(include)
+    keys = [post_key(postId)]
+    if comments_limit is not None:
+        keys.append(comments_key(postId))
+    etag = versions.etag(*keys, query=request.url.query)
+    if etag_matches(request, etag, exists=False):
+        return not_modified(etag)
+    if comments_limit is not None or likedBy is not None:
+        read = _with_embeds(
+            lambda: ([repo.get_post(postId)], None), comments_limit, likedBy
+        )
+        (post,), _ = await run_db(read)
+    else:
+        post = await cached_read(
+            ("post", postId), lambda post: [post_tag(postId)], repo.get_post, postId
         )
-    return row_to_post(row)
+    # If-None-Match: * 는 게시물이 있을 때만(404 가 아니면) 일치
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return FastJSONResponse(post, headers={"ETag": etag})
 
 
 @router.patch("/posts/{postId}")
-def update_post(postId: str, payload: NewPost):
-    now = iso_now()
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT id FROM posts WHERE id=?", (postId,))
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=404, detail={"code": 404, "message": "Not found"}
-        )
-    c.execute(
-        "UPDATE posts SET username=?, content=?, updatedAt=? WHERE id=?",
-        (payload.username, payload.content, now, postId),
-    )
-    conn.commit()
-    c.execute(
-        "SELECT id,username,content,createdAt,updatedAt,likes,commentsCount FROM posts WHERE id= ?",
-        (postId,),
-    )
-    row = c.fetchone()
-    conn.close()
-    return row_to_post(row)
+async def update_post(postId: str, payload: NewPost):
+    post = await run_db(repo.update_post, postId, payload.username, payload.content)
+    cache.invalidate_tags(post_tag(postId))
+    post_changed(postId)
+    bus.publish("post.updated", {"postId": postId})
+    return FastJSONResponse(post)
 
 
 @router.delete("/posts/{postId}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(postId: str):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT id FROM posts WHERE id=?", (postId,))
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=404, detail={"code": 404, "message": "Not found"}
-        )
-    c.execute("DELETE FROM posts WHERE id=?", (postId,))
-    c.execute("DELETE FROM comments WHERE postId=?", (postId,))
-    c.execute("DELETE FROM likes WHERE postId=?", (postId,))
-    conn.commit()
-    conn.close()
+async def delete_post(postId: str):
+    await run_db(repo.delete_post, postId)
+    cache.invalidate_tags(post_tag(postId), comments_tag(postId))
+    post_changed(postId)
+    comments_changed(postId)
+    trending.remove(postId)
+    bus.publish("post.deleted", {"postId": postId})
     return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content=None)
 
 
 @router.get("/posts/{postId}/comments")
-def list_comments(postId: str):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT id FROM posts WHERE id= ?", (postId,))
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=404, detail={"code": 404, "message": "Not found"}
+async def list_comments(
+    postId: str,
+    request: Request,
+    limit: int = Query(config.PAGE_DEFAULT_LIMIT, ge=1, le=config.PAGE_MAX_LIMIT),
+    after: Optional[str] = None,
+    stream: bool = False,
+):
+    if wants_stream(request, stream):
+        return await stream_pages(
+            request, functools.partial(repo.list_comments, postId), after
         )
-    c.execute(
-        "SELECT id,postId,username,content,createdAt,updatedAt FROM comments WHERE postId=? ORDER BY createdAt ASC",
-        (postId,),
-    )
-    rows = c.fetchall()
-    conn.close()
-    return [row_to_comment(r) for r in rows]
+    etag = versions.etag(comments_key(postId), query=request.url.query)
+    if etag_matches(request, etag, exists=False):
+        return not_modified(etag)
+    comments, next_cursor = await run_db(repo.list_comments, postId, limit, after)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return _page_response(comments, next_cursor, etag)
 
 
 @router.post("/posts/{postId}/comments", status_code=status.HTTP_201_CREATED)
-def create_comment(postId: str, payload: NewComment):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT id FROM posts WHERE id= ?", (postId,))
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=404, detail={"code": 404, "message": "Not found"}
-        )
-    id_ = str(uuid.uuid4())
-    now = iso_now()
-    c.execute(
-        "INSERT INTO comments (id,postId,username,content,createdAt) VALUES (?,?,?,?,?)",
-        (id_, postId, payload.username, payload.content, now),
+async def create_comment(postId: str, payload: NewComment):
+    comment = await run_db(
+        repo.create_comment, postId, payload.username, payload.content
     )
-    c.execute(
-        "UPDATE posts SET commentsCount = commentsCount + 1 WHERE id=?", (postId,)
+    cache.invalidate_tags(post_tag(postId))
+    post_changed(postId)
+    comments_changed(postId)
+    trending.record_comments(postId)
+    bus.publish(
+        "comment.created",
+        {"postId": postId, "commentId": comment["id"], "username": comment["username"]},
     )
-    conn.commit()
-    conn.close()
-    return {
-        "id": id_,
-        "postId": postId,
-        "username": payload.username,
-        "content": payload.content,
-        "createdAt": now,
-        "updatedAt": None,
-    }
+    return _created(comment)
 
 
 @router.get("/posts/{postId}/comments/{commentId}")
-def get_comment(postId: str, commentId: str):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT id FROM posts WHERE id= ?", (postId,))
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=404, detail={"code": 404, "message": "Not found"}
-        )
-    c.execute(
-        "SELECT id,postId,username,content,createdAt,updatedAt FROM comments WHERE id=? AND postId=?",
-        (commentId, postId),
+async def get_comment(postId: str, commentId: str, request: Request):
+    etag = versions.etag(comments_key(postId))
+    if etag_matches(request, etag, exists=False):
+        return not_modified(etag)
+    comment = await cached_read(
+        ("comment", postId, commentId),
+        lambda comment: [comments_tag(postId)],
+        repo.get_comment,
+        postId,
+        commentId,
     )
-    row = c.fetchone()
-    conn.close()
-    if not row:
-        raise HTTPException(
-            status_code=404, detail={"code": 404, "message": "Not found"}
-        )
-    return row_to_comment(row)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return FastJSONResponse(comment, headers={"ETag": etag})
 
 
 @router.patch("/posts/{postId}/comments/{commentId}")
-def update_comment(postId: str, commentId: str, payload: NewComment):
-    now = iso_now()
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT id FROM comments WHERE id=? AND postId=?", (commentId, postId))
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=404, detail={"code": 404, "message": "Not found"}
-        )
-    c.execute(
-        "UPDATE comments SET username=?, content=?, updatedAt=? WHERE id=? AND postId=?",
-        (payload.username, payload.content, now, commentId, postId),
+async def update_comment(postId: str, commentId: str, payload: NewComment):
+    comment = await run_db(
+        repo.update_comment, postId, commentId, payload.username, payload.content
     )
-    conn.commit()
-    c.execute(
-        "SELECT id,postId,username,content,createdAt,updatedAt FROM comments WHERE id=? AND postId=?",
-        (commentId, postId),
-    )
-    row = c.fetchone()
-    conn.close()
-    return row_to_comment(row)
+    cache.invalidate(("comment", postId, commentId))
+    comments_changed(postId)
+    return FastJSONResponse(comment)
 
 
 @router.delete(
     "/posts/{postId}/comments/{commentId}", status_code=status.HTTP_204_NO_CONTENT
 )
-def delete_comment(postId: str, commentId: str):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT id FROM comments WHERE id=? AND postId=?", (commentId, postId))
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=404, detail={"code": 404, "message": "Not found"}
-        )
-    c.execute("DELETE FROM comments WHERE id=? AND postId=?", (commentId, postId))
-    c.execute(
-        "UPDATE posts SET commentsCount = commentsCount - 1 WHERE id=?", (postId,)
-    )
-    conn.commit()
-    conn.close()
+async def delete_comment(postId: str, commentId: str):
+    await run_db(repo.delete_comment, postId, commentId)
+    cache.invalidate(("comment", postId, commentId))
+    cache.invalidate_tags(post_tag(postId))
+    post_changed(postId)
+    comments_changed(postId)
+    trending.record_comments(postId, -1)
     return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content=None)
 
 
 @router.post("/posts/{postId}/likes", status_code=status.HTTP_201_CREATED)
-def like_post(postId: str, payload: LikeRequest):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT id FROM posts WHERE id= ?", (postId,))
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=404, detail={"code": 404, "message": "Not found"}
-        )
-    try:
-        c.execute(
-            "INSERT INTO likes (postId, username) VALUES (?,?)",
-            (postId, payload.username),
-        )
-    except sqlite3.IntegrityError:
-        conn.close()
-        raise HTTPException(
-            status_code=400, detail={"code": 400, "message": "Bad request"}
-        )
-    c.execute("UPDATE posts SET likes = likes + 1 WHERE id=?", (postId,))
-    c.execute("SELECT likes FROM posts WHERE id=?", (postId,))
-    total = c.fetchone()[0]
-    conn.commit()
-    conn.close()
-    return {"postId": postId, "username": payload.username, "totalLikes": total}
+async def like_post(postId: str, payload: LikeRequest):
+    total = await run_db(repo.like_post, postId, payload.username)
+    cache.invalidate_tags(post_tag(postId))
+    post_changed(postId)
+    trending.record_likes(postId)
+    bus.publish("post.liked", {"postId": postId, "totalLikes": total})
+    return _created(
+        {"postId": postId, "username": payload.username, "totalLikes": total}
+    )
 
 
 @router.delete("/posts/{postId}/likes", status_code=status.HTTP_204_NO_CONTENT)
-def unlike_post(postId: str, payload: LikeRequest):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT id FROM posts WHERE id= ?", (postId,))
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=404, detail={"code": 404, "message": "Not found"}
-        )
-    c.execute(
-        "SELECT username FROM likes WHERE postId=? AND username= ?",
-        (postId, payload.username),
+async def unlike_post(postId: str, payload: LikeRequest):
+    await run_db(repo.unlike_post, postId, payload.username)
+    cache.invalidate_tags(post_tag(postId))
+    post_changed(postId)
+    trending.record_likes(postId, -1)
+    return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content=None)
+
+
+@router.get("/users/{username}/posts")
+async def list_user_posts(
+    username: str,
+    limit: int = Query(config.PAGE_DEFAULT_LIMIT, ge=1, le=config.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
+    likedBy: Optional[str] = None,
+):
+    # (username, createdAt, id) 인덱스를 따라 최신순으로 읽는다. 없는 사용자는 빈 목록
+    read = _with_embeds(repo.list_user_posts, _comments_include(include), likedBy)
+    posts, next_cursor = await run_db(read, username, limit, cursor)
+    return _page_response(posts, next_cursor)
+
+
+@router.get("/users/{username}/comments")
+async def list_user_comments(
+    username: str,
+    limit: int = Query(config.PAGE_DEFAULT_LIMIT, ge=1, le=config.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    comments, next_cursor = await run_db(
+        repo.list_user_comments, username, limit, cursor
     )
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=400, detail={"code": 400, "message": "Bad request"}
-        )
-    c.execute(
-        "DELETE FROM likes WHERE postId=? AND username= ?", (postId, payload.username)
+    return _page_response(comments, next_cursor)
+
+
+@router.get("/users/{username}/likes")
+async def list_user_likes(
+    username: str,
+    limit: int = Query(config.PAGE_DEFAULT_LIMIT, ge=1, le=config.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
+    likedBy: Optional[str] = None,
+):
+    # 좋아요한 게시물. 좋아요 시각은 저장하지 않으므로 게시물 ID 내림차순이다
+    read = _with_embeds(repo.list_user_likes, _comments_include(include), likedBy)
+    posts, next_cursor = await run_db(read, username, limit, cursor)
+    return _page_response(posts, next_cursor)
+
+
+@router.get("/stream")
+async def stream_events():
+    # 변경 이벤트 SSE. 목록을 주기적으로 다시 읽는 대신 이 연결로 알림을 받고
+    # 필요한 게시물만 다시 읽는다. 일괄 API 는 이벤트를 발행하지 않는다.
+    subscriber = bus.subscribe()
+    if subscriber is None:
+        raise service_unavailable()
+    return StreamingResponse(
+        sse_events(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    c.execute("UPDATE posts SET likes = likes - 1 WHERE id=?", (postId,))
-    conn.commit()
-    conn.close()
-    return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content=None)
+
+
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: str = Query("all", alias="type", pattern="^(all|posts|comments)$"),
+    limit: int = Query(config.PAGE_DEFAULT_LIMIT, ge=1, le=config.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    results, next_cursor, truncated = await run_db(repo.search, q, kind, limit, cursor)
+    response = _page_response(results, next_cursor)
+    if truncated:
+        # 최근 SEARCH_MAX_CANDIDATES 건의 일치 행 안에서만 순위를 매겼다 (더 오래된 일치는 빠짐)
+        response.headers["X-Search-Truncated"] = "true"
+    return response
+
+
+def _check_bulk_size(items):
+    if len(items) > config.BULK_MAX_ITEMS:
+        raise bad_request()
+
+
+def _created_per_post(items, results):
+    return Counter(
+        item.postId for item, result in zip(items, results) if result["status"] == 201
+    )
+
+
+@router.post("/bulk/posts")
+async def bulk_create_posts(items: List[NewPost] = Body(...)):
+    _check_bulk_size(items)
+    results = await run_db(
+        repo.bulk_create_posts, [(i.username, i.content) for i in items]
+    )
+    cache.invalidate_tags(FEED_HEAD_TAG)
+    post_created(*(result["data"]["id"] for result in results))
+    return FastJSONResponse(results)
+
+
+@router.post("/bulk/comments")
+async def bulk_create_comments(items: List[BulkComment] = Body(...)):
+    _check_bulk_size(items)
+    results = await run_db(
+        repo.bulk_create_comments,
+        [(i.postId, i.username, i.content) for i in items],
+    )
+    post_ids = {i.postId for i in items}
+    cache.invalidate_tags(*(post_tag(post_id) for post_id in post_ids))
+    post_changed(*post_ids)
+    comments_changed(*post_ids)
+    for post_id, n in _created_per_post(items, results).items():
+        trending.record_comments(post_id, n)
+    return FastJSONResponse(results)
+
+
+@router.post("/bulk/likes")
+async def bulk_like(items: List[BulkLike] = Body(...)):
+    _check_bulk_size(items)
+    results = await run_db(repo.bulk_like, [(i.postId, i.username) for i in items])
+    post_ids = {i.postId for i in items}
+    cache.invalidate_tags(*(post_tag(post_id) for post_id in post_ids))
+    post_changed(*post_ids)
+    for post_id, n in _created_per_post(items, results).items():
+        trending.record_likes(post_id, n)
+    return FastJSONResponse(results)
@@ -13,3 +13,12 @@ class NewComment(BaseModel):
 
 class LikeRequest(BaseModel):
     username: str
+
+
+# 일괄 생성 요청: 댓글/좋아요는 대상 게시물 ID를 항목마다 지정
+class BulkComment(NewComment):
+    postId: str
+
+
+class BulkLike(LikeRequest):
+    postId: str
@@ -0,0 +1,222 @@
+import heapq
+import itertools
+import os
+
+import config
+from db import ConnectionPool
+from likes import LikeAggregator
+from repository import Repository, SqliteRepository, shard_of
+from utils import encode_cursor, search_cursor
+
+
+def shard_paths(path, count):
+    # sns_api.db -> sns_api.shard0.db, sns_api.shard1.db, ...
+    root, ext = os.path.splitext(path)
+    return [f"{root}.shard{i}{ext or '.db'}" for i in range(count)]
+
+
+class ShardedRepository(Repository):
+    # SQLite 는 파일 하나에 쓰기 락이 하나뿐이므로 게시물(과 그 댓글/좋아요)을
+    # crc32(postId) % N 으로 고른 N 개의 DB 파일에 나눠 저장해 쓰기를 병렬로 받는다.
+    # 게시물 단위 연산은 한 샤드로만 가고, 전체 목록/검색은 모든 샤드를 읽어 병합한다.
+    # 샤드 수를 바꾸면 기존 게시물의 위치가 달라지므로 데이터를 다시 나눠야 한다.
+
+    def __init__(self, shards):
+        self.shards = shards
+        self.pools = tuple(shard.pool for shard in shards)
+        # 새 게시물은 샤드를 돌아가며 배정한다 (ID 는 그 샤드로 해시되게 만든다)
+        self._next = itertools.count()
+
+    def start(self):
+        for shard in self.shards:
+            shard.start()
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+        for pool in self.pools:
+            pool.close_all()
+
+    def _shard(self, post_id):
+        return self.shards[shard_of(post_id, len(self.shards))]
+
+    def _scatter(self, items, index_of, call):
+        # 항목을 샤드별로 묶어 샤드마다 한 번씩 call 하고, 결과를 원래 순서로 되돌린다.
+        # 일괄 요청의 원자성은 샤드 단위다.
+        groups = {}
+        for pos, item in enumerate(items):
+            groups.setdefault(index_of(item), []).append(pos)
+        results = [None] * len(items)
+        for index, positions in groups.items():
+            out = call(self.shards[index], [items[pos] for pos in positions])
+            for pos, result in zip(positions, out):
+                results[pos] = result
+        return results
+
+    # 게시물
+
+    def _merge_pages(self, pages, limit, key):
+        # 커서는 샤드와 무관한 정렬 키이므로 모든 샤드에 같은 커서로 limit 건씩
+        # 읽고 key 내림차순으로 k-way 병합한다
+        merged = heapq.merge(*(items for items, _ in pages), key=key, reverse=True)
+        items = list(itertools.islice(merged, limit))
+        more = any(next_cursor for _, next_cursor in pages) or (
+            sum(len(p) for p, _ in pages) > limit
+        )
+        next_cursor = None
+        if more and items:
+            next_cursor = encode_cursor(*key(items[-1]))
+        return items, next_cursor
+
+    def list_posts(self, limit, cursor=None):
+        pages = [shard.list_posts(limit, cursor) for shard in self.shards]
+        return self._merge_pages(pages, limit, _time_key)
+
+    def create_post(self, username, content):
+        index = next(self._next) % len(self.shards)
+        return self.shards[index].create_post(username, content)
+
+    def get_post(self, post_id):
+        return self._shard(post_id).get_post(post_id)
+
+    def update_post(self, post_id, username, content):
+        return self._shard(post_id).update_post(post_id, username, content)
+
+    def delete_post(self, post_id):
+        return self._shard(post_id).delete_post(post_id)
+
+    # 댓글
+
+    def list_comments(self, post_id, limit, after=None):
+        return self._shard(post_id).list_comments(post_id, limit, after)
+
+    def create_comment(self, post_id, username, content):
+        return self._shard(post_id).create_comment(post_id, username, content)
+
+    def get_comment(self, post_id, comment_id):
+        return self._shard(post_id).get_comment(post_id, comment_id)
+
+    def update_comment(self, post_id, comment_id, username, content):
+        return self._shard(post_id).update_comment(
+            post_id, comment_id, username, content
+        )
+
+    def delete_comment(self, post_id, comment_id):
+        return self._shard(post_id).delete_comment(post_id, comment_id)
+
+    # 좋아요
+
+    def like_post(self, post_id, username):
+        return self._shard(post_id).like_post(post_id, username)
+
+    def unlike_post(self, post_id, username):
+        return self._shard(post_id).unlike_post(post_id, username)
+
+    # 사용자별 목록: 사용자의 글은 여러 샤드에 흩어져 있으므로 모두 읽어 병합한다
+
+    def list_user_posts(self, username, limit, cursor=None):
+        pages = [
+            shard.list_user_posts(username, limit, cursor) for shard in self.shards
+        ]
+        return self._merge_pages(pages, limit, _time_key)
+
+    def list_user_comments(self, username, limit, cursor=None):
+        pages = [
+            shard.list_user_comments(username, limit, cursor) for shard in self.shards
+        ]
+        return self._merge_pages(pages, limit, _time_key)
+
+    def list_user_likes(self, username, limit, cursor=None):
+        pages = [
+            shard.list_user_likes(username, limit, cursor) for shard in self.shards
+        ]
+        return self._merge_pages(pages, limit, lambda post: (post["id"],))
+
+    # 일괄 처리
+
+    def bulk_create_posts(self, items):
+        return self._scatter(
+            items,
+            lambda item: next(self._next) % len(self.shards),
+            lambda shard, group: shard.bulk_create_posts(group),
+        )
+
+    def bulk_create_comments(self, items):
+        return self._scatter(
+            items,
+            lambda item: shard_of(item[0], len(self.shards)),
+            lambda shard, group: shard.bulk_create_comments(group),
+        )
+
+    def bulk_like(self, items):
+        return self._scatter(
+            items,
+            lambda item: shard_of(item[0], len(self.shards)),
+            lambda shard, group: shard.bulk_like(group),
+        )
+
+    # 묶음 조회 / 임베드: 샤드별로 한 번씩 조회한다
+
+    def get_posts(self, post_ids):
+        groups = {}
+        for id_ in post_ids:
+            groups.setdefault(shard_of(id_, len(self.shards)), []).append(id_)
+        found = {}
+        for index, ids in groups.items():
+            found.update(
+                (post["id"], post) for post in self.shards[index].get_posts(ids)
+            )
+        return [found[id_] for id_ in post_ids if id_ in found]
+
+    def recent_engagement(self, limit):
+        rows = heapq.merge(
+            *(shard.recent_engagement(limit) for shard in self.shards),
+            key=lambda row: (row[3], row[0]),
+            reverse=True,
+        )
+        return list(itertools.islice(rows, limit))
+
+    def embed(self, posts, comments_limit=None, liked_by=None):
+        groups = {}
+        for post in posts:
+            groups.setdefault(shard_of(post["id"], len(self.shards)), []).append(post)
+        for index, group in groups.items():
+            self.shards[index].embed(group, comments_limit, liked_by)
+        return posts
+
+    # 전문 검색
+
+    def search(self, q, kind, limit, cursor=None):
+        # 샤드마다 상위 offset + limit 건을 받아 점수 순으로 병합한다.
+        # bm25 는 샤드별 통계로 계산되지만 샤드가 해시로 고르게 나뉘므로 차이는 작다.
+        offset = search_cursor(cursor)
+        wanted = offset + limit
+        pages = [shard.search(q, kind, wanted) for shard in self.shards]
+        merged = list(
+            heapq.merge(*(hits for hits, _, _ in pages), key=lambda hit: -hit["score"])
+        )
+        results = merged[offset:wanted]
+        more = len(merged) > wanted or any(next_cursor for _, next_cursor, _ in pages)
+        truncated = any(truncated for _, _, truncated in pages)
+        return results, encode_cursor(wanted) if more else None, truncated
+
+    def like_stats(self):
+        stats = [shard.like_stats() for shard in self.shards]
+        if stats[0] is None:
+            return None
+        return {"shards": stats}
+
+
+def _time_key(item):
+    return item["createdAt"], item["id"]
+
+
+def create_sharded_repository(count):
+    shards = []
+    for index, path in enumerate(shard_paths(config.DB_PATH, count)):
+        pool = ConnectionPool(path, config.DB_POOL_SIZE, config.DB_POOL_TIMEOUT)
+        likes = None
+        if config.LIKE_AGGREGATION:
+            likes = LikeAggregator(pool, config.LIKE_FLUSH_INTERVAL)
+        shards.append(SqliteRepository(pool, likes, shard=(index, count)))
+    return ShardedRepository(shards)
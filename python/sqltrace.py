@@ -0,0 +1,185 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(sql):
+    # 공백을 접고, 리터럴과 길이가 다른 IN (?, ?, ...) 목록을 하나로 묶어
+    # 같은 모양의 문장이 한 항목으로 집계되게 한다
+    sql = _SPACE.sub(" ", sql).strip()
+    sql = _IN_LIST.sub("(?, ...)", sql)
+    return _LITERAL.sub("?", sql)
+
+
+class SqlStats:
+    # 정규화한 문장별 실행 횟수/누적 시간/최대 시간과 마지막 느린 실행의 쿼리 플랜
+
+    def __init__(self, slow_ms):
+        self.slow = slow_ms / 1000
+        self._lock = threading.Lock()
+        self._normalized = {}
+        self._stats = {}
+        self.slow_queries = 0
+
+    def key(self, sql):
+        key = self._normalized.get(sql)
+        if key is None:
+            key = normalize(sql)
+            if len(self._normalized) < 10000:
+                self._normalized[sql] = key
+        return key
+
+    def record(self, key, elapsed, executed):
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = {
+                    "count": 0,
+                    "totalMs": 0.0,
+                    "maxMs": 0.0,
+                    "slow": 0,
+                    "plan": None,
+                }
+            entry["count"] += executed
+            entry["totalMs"] += elapsed * 1000
+
+    def finish(self, key, elapsed):
+        with self._lock:
+            entry = self._stats[key]
+            entry["maxMs"] = max(entry["maxMs"], elapsed * 1000)
+
+    def record_slow(self, key, elapsed, plan):
+        with self._lock:
+            entry = self._stats[key]
+            entry["slow"] += 1
+            entry["plan"] = plan
+            self.slow_queries += 1
+        logger.warning(
+            "slow query (%.1f ms): %s\n%s", elapsed * 1000, key, "\n".join(plan or ())
+        )
+
+    def snapshot(self, limit=50):
+        with self._lock:
+            items = [
+                {"sql": key, **entry, "plan": list(entry["plan"] or ())}
+                for key, entry in self._stats.items()
+            ]
+            slow_queries = self.slow_queries
+        items.sort(key=lambda x: x["totalMs"], reverse=True)
+        for item in items:
+            item["avgMs"] = item["totalMs"] / item["count"] if item["count"] else 0.0
+        return {
+            "slowThresholdMs": self.slow * 1000,
+            "statements": len(items),
+            "slowQueries": slow_queries,
+            "top": items[:limit],
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.slow_queries = 0
+
+
+stats = SqlStats(config.SQL_SLOW_MS)
+
+
+def _explain(conn, sql, params):
+    try:
+        rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params)
+        return [row[3] for row in rows.fetchall()]
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+class TracedCursor(sqlite3.Cursor):
+    # execute 부터 fetch* 까지 걸린 시간을 해당 문장 한 번의 실행 시간으로 본다
+    # (SELECT 는 execute 가 첫 행까지만 진행하므로 나머지는 fetch 에서 소요된다)
+
+    _trace_key = None
+
+    def _begin(self, sql, params, elapsed, executed):
+        self._trace_key = key = stats.key(sql)
+        self._trace_sql = sql
+        self._trace_params = params
+        self._trace_elapsed = elapsed
+        self._trace_logged = False
+        stats.record(key, elapsed, executed)
+        self._check()
+
+    def _check(self):
+        stats.finish(self._trace_key, self._trace_elapsed)
+        if not self._trace_logged and self._trace_elapsed >= stats.slow:
+            self._trace_logged = True
+            params = self._trace_params
+            plan = (
+                None
+                if params is None
+                else _explain(self.connection, self._trace_sql, params)
+            )
+            stats.record_slow(self._trace_key, self._trace_elapsed, plan)
+
+    def _fetched(self, elapsed):
+        if self._trace_key is not None:
+            stats.record(self._trace_key, elapsed, 0)
+            self._trace_elapsed += elapsed
+            self._check()
+
+    def execute(self, sql, params=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            self._begin(sql, params, time.perf_counter() - start, 1)
+
+    def executemany(self, sql, seq_of_params):
+        # 파라미터 묶음은 이미 소비됐을 수 있으므로 플랜은 구하지 않는다
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_params)
+        finally:
+            self._begin(sql, None, time.perf_counter() - start, 1)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._fetched(time.perf_counter() - start)
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self._fetched(time.perf_counter() - start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._fetched(time.perf_counter() - start)
+
+
+class TracedConnection(sqlite3.Connection):
+    # 풀이 SNS_SQL_TRACE=1 일 때 sqlite3.connect(factory=...) 로 사용하는 연결 클래스
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
@@ -0,0 +1,49 @@
+from fastapi.responses import StreamingResponse
+
+import config
+from db import run_db
+from responses import dumps
+
+NDJSON = "application/x-ndjson"
+
+
+def wants_stream(request, stream):
+    return stream or NDJSON in request.headers.get("accept", "")
+
+
+async def stream_pages(request, fetch_page, cursor=None):
+    # 키셋 페이지 단위(SNS_STREAM_BATCH_SIZE)로 읽어 바로 내보내므로
+    # 전체 결과를 메모리에 올리지 않는다. 배치마다 짧은 읽기만 하므로
+    # 긴 읽기 트랜잭션이 WAL 체크포인트를 막지도 않는다.
+    # 첫 배치는 응답 시작 전에 읽어서 404 등의 오류를 그대로 돌려준다.
+    items, next_cursor = await run_db(fetch_page, config.STREAM_BATCH_SIZE, cursor)
+
+    async def pages():
+        nonlocal items, next_cursor
+        yield items
+        while next_cursor:
+            items, next_cursor = await run_db(
+                fetch_page, config.STREAM_BATCH_SIZE, next_cursor
+            )
+            yield items
+
+    if NDJSON in request.headers.get("accept", ""):
+        return StreamingResponse(_ndjson(pages()), media_type=NDJSON)
+    return StreamingResponse(_json_array(pages()), media_type="application/json")
+
+
+async def _ndjson(pages):
+    async for items in pages:
+        if items:
+            yield b"".join(dumps(item) + b"\n" for item in items)
+
+
+async def _json_array(pages):
+    first = True
+    yield b"["
+    async for items in pages:
+        if items:
+            chunk = b",".join(dumps(item) for item in items)
+            yield chunk if first else b"," + chunk
+            first = False
+    yield b"]"
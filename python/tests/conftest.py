@@ -0,0 +1,22 @@
+import os
+import sys
+import tempfile
+
+# 앱 모듈은 import 시점에 설정을 읽으므로 먼저 임시 DB 경로를 잡아 둔다
+os.environ.setdefault(
+    "SNS_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="sns-test-"), "test.db")
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    # 앱 전체(startup/shutdown 포함)를 한 번 띄워 여러 테스트가 같이 쓴다
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    with TestClient(app) as c:
+        yield c
@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+import config
+from cache import LRUCache, cache
+
+
+def _new_post(client, content):
+    r = client.post("/api/posts", json={"username": "cacher", "content": content})
+    assert r.status_code in (200, 201), r.text
+    return r.json()["id"]
+
+
+def test_invalidate_tags_removes_only_tagged_entries():
+    lru = LRUCache(10)
+    lru.set("a", 1, tags=[("post", "a")])
+    lru.set("b", 2, tags=[("post", "b")])
+    lru.set("page", [1, 2], tags=[("post", "a"), ("post", "b")])
+
+    lru.invalidate_tags(("post", "b"))
+    assert lru.get("a") == 1
+    assert lru.get("b") is None
+    assert lru.get("page") is None
+
+
+def test_stale_read_is_not_cached_after_invalidation():
+    lru = LRUCache(10)
+    generation = lru.generation
+    lru.invalidate_tags(("post", "a"))
+    lru.set("a", "before commit", tags=[("post", "a")], generation=generation)
+    assert lru.get("a") is None
+
+
+def test_write_to_one_post_keeps_other_posts_cached(client):
+    if config.DB_WATCH:
+        pytest.skip("data_version 감시는 자기 커밋에도 캐시 전체를 비운다")
+    a, b = _new_post(client, "a"), _new_post(client, "b")
+    first = client.get(f"/api/posts/{a}")
+    etag = first.headers["etag"]
+
+    hits = cache.stats()["hits"]
+    assert client.get(f"/api/posts/{a}").json() == first.json()
+    assert cache.stats()["hits"] == hits + 1
+
+    r = client.post(f"/api/posts/{b}/likes", json={"username": "fan"})
+    assert r.status_code in (200, 201), r.text
+
+    # 다른 게시물의 쓰기는 a 의 캐시 항목과 ETag 를 건드리지 않는다
+    # (단일 프로세스에서 감시가 켜졌다면 그 사이 캐시가 비워진다)
+    time.sleep(config.DB_WATCH_INTERVAL * 4)
+    hits = cache.stats()["hits"]
+    assert client.get(f"/api/posts/{a}").json() == first.json()
+    assert cache.stats()["hits"] == hits + 1
+    r = client.get(f"/api/posts/{a}", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+    # 좋아요를 받은 b 는 다시 읽어 새 값을 돌려준다
+    assert client.get(f"/api/posts/{b}").json()["likes"] == 1
@@ -0,0 +1,78 @@
+def _new_post(client, content="etag"):
+    r = client.post("/api/posts", json={"username": "tagger", "content": content})
+    assert r.status_code in (200, 201), r.text
+    return r.json()["id"]
+
+
+def test_post_etag_round_trip(client):
+    post_id = _new_post(client)
+    r = client.get(f"/api/posts/{post_id}")
+    etag = r.headers["etag"]
+
+    r = client.get(f"/api/posts/{post_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    # 약한 비교: W/ 접두어와 목록 형식도 일치
+    r = client.get(
+        f"/api/posts/{post_id}", headers={"If-None-Match": f'"other", W/{etag}'}
+    )
+    assert r.status_code == 304
+
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "fan"})
+    r = client.get(f"/api/posts/{post_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert r.json()["likes"] == 1
+
+
+def test_wildcard_matches_only_existing_resources(client):
+    post_id = _new_post(client)
+    star = {"If-None-Match": "*"}
+    assert client.get(f"/api/posts/{post_id}", headers=star).status_code == 304
+    assert client.get("/api/posts/missing-post", headers=star).status_code == 404
+    assert (
+        client.get("/api/posts/missing-post/comments", headers=star).status_code == 404
+    )
+    assert (
+        client.get(f"/api/posts/{post_id}/comments/missing", headers=star).status_code
+        == 404
+    )
+
+
+def test_list_etags_differ_by_query(client):
+    for i in range(3):
+        _new_post(client, f"page {i}")
+    first = client.get("/api/posts", params={"limit": 2})
+    other_limit = client.get("/api/posts", params={"limit": 3})
+    second = client.get(
+        "/api/posts",
+        params={"limit": 2, "cursor": first.headers["x-next-cursor"]},
+    )
+    tags = {r.headers["etag"] for r in (first, other_limit, second)}
+    assert len(tags) == 3
+
+    # 다른 페이지의 ETag 로는 304 가 나오지 않는다
+    r = client.get(
+        "/api/posts",
+        params={"limit": 2, "cursor": first.headers["x-next-cursor"]},
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert r.status_code == 200
+    r = client.get(
+        "/api/posts",
+        params={"limit": 2},
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert r.status_code == 304
+
+
+def test_comments_etag_changes_with_new_comment(client):
+    post_id = _new_post(client)
+    path = f"/api/posts/{post_id}/comments"
+    etag = client.get(path).headers["etag"]
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(path, json={"username": "tagger", "content": "first"})
+    r = client.get(path, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert [c["content"] for c in r.json()] == ["first"]
@@ -0,0 +1,41 @@
+import threading
+import time
+
+from db import ConnectionPool, PoolTimeout, init_db
+from likes import LikeAggregator
+from repository import SqliteRepository
+
+
+def test_flush_does_not_deadlock_with_like_requests(tmp_path):
+    # 요청 스레드가 풀 연결을 모두 쥔 채 add()/read_consistent() 를 부르는 동안에도
+    # flush 가 진행되어야 한다 (예전에는 flush 가 _lock 을 쥔 채 연결을 기다려 교착)
+    pool = ConnectionPool(str(tmp_path / "likes.db"), 4, 3.0)
+    init_db(pool)
+    likes = LikeAggregator(pool, 0.001)
+    repo = SqliteRepository(pool, likes)
+    posts = [repo.create_post("author", f"post {i}")["id"] for i in range(4)]
+    repo.start()
+    threads, per_thread = 16, 300
+    errors = []
+
+    def worker(n):
+        for i in range(per_thread):
+            try:
+                repo.like_post(posts[i % len(posts)], f"user-{n}-{i}")
+            except PoolTimeout as exc:
+                errors.append(exc)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    repo.close()
+
+    assert errors == []
+    assert elapsed < pool.timeout
+    assert likes.flushes > 0
+    assert sum(repo.get_post(id_)["likes"] for id_ in posts) == threads * per_thread
+    pool.close_all()
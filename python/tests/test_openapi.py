@@ -0,0 +1,33 @@
+import pytest
+
+from openapi import accepts_gzip
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", True),
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, gzip;q=0.5", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.000", False),
+        ("identity", False),
+        ("", False),
+        ("*", True),
+        ("*;q=0", False),
+        ("gzip;q=0, *", False),
+        ("x-gzip", True),
+        ("gzip;q=bogus", False),
+    ],
+)
+def test_accepts_gzip_honours_q_values(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+def test_openapi_json_encoding_follows_accept_encoding(client):
+    gzipped = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    refused = client.get("/openapi.json", headers={"Accept-Encoding": "gzip;q=0"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in refused.headers
+    assert gzipped.json() == refused.json()
+    assert gzipped.headers["etag"] != refused.headers["etag"]
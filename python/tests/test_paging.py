@@ -0,0 +1,82 @@
+import base64
+import json
+
+import pytest
+
+
+def _cursor(value):
+    raw = json.dumps(value).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _pages(client, path, limit, param="cursor"):
+    items, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit, **({param: cursor} if cursor else {})}
+        r = client.get(path, params=params)
+        assert r.status_code == 200, r.text
+        items += r.json()
+        pages += 1
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            return items, pages
+
+
+def test_feed_pages_are_disjoint_and_newest_first(client):
+    ids = [
+        client.post(
+            "/api/posts", json={"username": "pager", "content": f"p{i}"}
+        ).json()["id"]
+        for i in range(7)
+    ]
+    posts, pages = _pages(client, "/api/posts", 3)
+    keys = [(p["createdAt"], p["id"]) for p in posts]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == len(keys)
+    assert pages == -(-len(posts) // 3)
+    mine, _ = _pages(client, "/api/users/pager/posts", 2)
+    assert [p["id"] for p in mine] == ids[::-1]
+
+
+def test_comment_pages_follow_after_cursor(client):
+    post = client.post("/api/posts", json={"username": "c", "content": "x"}).json()
+    ids = [
+        client.post(
+            f"/api/posts/{post['id']}/comments",
+            json={"username": "c", "content": str(i)},
+        ).json()["id"]
+        for i in range(5)
+    ]
+    comments, _ = _pages(client, f"/api/posts/{post['id']}/comments", 2, "after")
+    assert [c["id"] for c in comments] == ids
+
+
+@pytest.mark.parametrize(
+    "path, param",
+    [
+        ("/api/posts", "cursor"),
+        ("/api/users/u/posts", "cursor"),
+        ("/api/users/u/comments", "cursor"),
+        ("/api/users/u/likes", "cursor"),
+        ("/api/posts/nope/comments", "after"),
+        ("/api/posts/trending", "cursor"),
+        ("/api/search", "cursor"),
+    ],
+)
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "garbage!",
+        _cursor([{}, 1]),
+        _cursor(["a", {}]),
+        _cursor([[1], "x"]),
+        _cursor([-1]),
+        _cursor(["a", "b", "c"]),
+        _cursor([True]),
+        _cursor({"a": 1}),
+    ],
+)
+def test_malformed_cursor_is_bad_request(client, path, param, cursor):
+    params = {param: cursor, **({"q": "x"} if path == "/api/search" else {})}
+    r = client.get(path, params=params)
+    assert r.status_code == 400, (path, cursor, r.status_code)
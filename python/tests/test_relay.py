@@ -0,0 +1,42 @@
+import asyncio
+
+import relay as relay_module
+from pubsub import bus
+from relay import EventRelay, relay_path
+
+
+def test_relay_path_sits_next_to_the_db():
+    assert relay_path("/x/sns_api.db") == "/x/sns_api.events.db"
+
+
+def test_events_reach_other_workers_only(tmp_path, monkeypatch):
+    delivered = []
+    monkeypatch.setattr(relay_module, "_deliver", delivered.extend)
+    monkeypatch.setattr(bus, "relay", bus.relay)
+    path = str(tmp_path / "t.events.db")
+
+    async def scenario():
+        # 같은 이벤트 파일을 쓰는 두 워커
+        a, b = EventRelay(path, 0.01, 100), EventRelay(path, 0.01, 100)
+        await a.start()
+        await b.start()
+        try:
+            a.send("post.created", {"postId": "p1"})
+            b.send("post.liked", {"postId": "p1", "totalLikes": 1})
+            for _ in range(200):
+                if len(delivered) >= 2:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+        finally:
+            a.stop()
+            b.stop()
+        return a, b
+
+    a, b = asyncio.run(scenario())
+    # 각 이벤트는 다른 워커에만 한 번씩 전달된다 (자기 이벤트는 다시 받지 않음)
+    assert sorted(delivered, key=lambda item: item[0]) == [
+        ("post.created", {"postId": "p1"}),
+        ("post.liked", {"postId": "p1", "totalLikes": 1}),
+    ]
+    assert (a.sent, a.received, b.sent, b.received) == (1, 1, 1, 1)
@@ -0,0 +1,69 @@
+import config
+
+
+def _post(client, content):
+    r = client.post("/api/posts", json={"username": "finder", "content": content})
+    assert r.status_code in (200, 201), r.text
+    return r.json()["id"]
+
+
+def _search_pages(client, q, limit):
+    hits, cursor, pages = [], None, 0
+    while True:
+        params = {"q": q, "limit": limit, **({"cursor": cursor} if cursor else {})}
+        r = client.get("/api/search", params=params)
+        assert r.status_code == 200, r.text
+        hits += r.json()
+        pages += 1
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            return hits, pages
+
+
+def test_more_mentions_rank_higher(client):
+    once = _post(client, "zebrafish once in a long sentence about other things")
+    often = _post(client, "zebrafish zebrafish zebrafish")
+    r = client.get("/api/search", params={"q": "zebrafish", "type": "posts"})
+    assert r.status_code == 200, r.text
+    hits = r.json()
+    assert [hit["data"]["id"] for hit in hits] == [often, once]
+    assert hits[0]["score"] >= hits[1]["score"]
+    assert "x-search-truncated" not in r.headers
+
+
+def test_last_word_matches_as_prefix_and_all_words_are_required(client):
+    both = _post(client, "quokka habitat notes")
+    _post(client, "quokka only")
+    r = client.get("/api/search", params={"q": "quokka hab", "type": "posts"})
+    assert [hit["data"]["id"] for hit in r.json()] == [both]
+
+
+def test_search_pages_cover_every_hit_once(client):
+    ids = {_post(client, "narwhal " * (i + 1)) for i in range(7)}
+    client.post(
+        "/api/posts/" + next(iter(ids)) + "/comments",
+        json={"username": "finder", "content": "narwhal comment"},
+    )
+    hits, pages = _search_pages(client, "narwhal", 3)
+    assert pages == 3
+    assert {hit["data"]["id"] for hit in hits if hit["type"] == "post"} == ids
+    assert [hit["type"] for hit in hits].count("comment") == 1
+    scores = [hit["score"] for hit in hits]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_candidate_limit_is_reported(client):
+    cap = config.SEARCH_MAX_CANDIDATES
+    if config.BACKEND != "sqlite" or not cap:
+        return
+    # 후보 제한은 샤드마다 적용되므로 어느 한 샤드는 반드시 넘도록 만든다
+    remaining = cap * max(config.DB_SHARDS, 1) + 1
+    while remaining:
+        n = min(remaining, config.BULK_MAX_ITEMS)
+        items = [{"username": "finder", "content": "axolotl"} for _ in range(n)]
+        r = client.post("/api/bulk/posts", json=items)
+        assert r.status_code in (200, 201, 207), r.text
+        remaining -= n
+    r = client.get("/api/search", params={"q": "axolotl", "type": "posts"})
+    assert r.status_code == 200, r.text
+    assert r.headers["x-search-truncated"] == "true"
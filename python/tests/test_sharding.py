@@ -0,0 +1,70 @@
+import sqlite3
+
+import pytest
+
+from db import ConnectionPool
+from repository import SqliteRepository, shard_of
+from sharding import ShardedRepository, shard_paths
+
+SHARDS = 3
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    paths = shard_paths(str(tmp_path / "s.db"), SHARDS)
+    shards = [
+        SqliteRepository(ConnectionPool(path, 4, 5.0), shard=(index, SHARDS))
+        for index, path in enumerate(paths)
+    ]
+    repo = ShardedRepository(shards)
+    repo.start()
+    yield repo, paths
+    repo.close()
+
+
+def _post_ids_in(path):
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT id FROM posts")}
+
+
+def test_shard_of_is_stable_and_in_range():
+    # crc32 기반이라 프로세스/재시작과 관계없이 같은 값 (hash() 는 실행마다 바뀐다)
+    assert shard_of("abc", 3) == shard_of("abc", 3)
+    assert {shard_of(f"id-{i}", SHARDS) for i in range(200)} == set(range(SHARDS))
+
+
+def test_shard_paths_keep_extension():
+    assert shard_paths("/x/sns_api.db", 2) == [
+        "/x/sns_api.shard0.db",
+        "/x/sns_api.shard1.db",
+    ]
+    assert shard_paths("/x/data", 1) == ["/x/data.shard0.db"]
+
+
+def test_new_posts_are_stored_where_their_id_routes(sharded):
+    repo, paths = sharded
+    single = [repo.create_post("router", f"p{i}")["id"] for i in range(12)]
+    bulk = [r["data"]["id"] for r in repo.bulk_create_posts([("router", "b")] * 12)]
+    for index, path in enumerate(paths):
+        stored = _post_ids_in(path)
+        assert stored, "posts should spread over every shard"
+        assert all(shard_of(id_, SHARDS) == index for id_ in stored)
+    assert set(single + bulk) == set().union(*(_post_ids_in(p) for p in paths))
+
+
+def test_post_operations_reach_the_owning_shard(sharded):
+    repo, paths = sharded
+    post_id = repo.create_post("router", "hello")["id"]
+    repo.create_comment(post_id, "router", "first")
+    repo.like_post(post_id, "fan")
+    post = repo.get_post(post_id)
+    assert (post["likes"], post["commentsCount"]) == (1, 1)
+
+    owner = paths[shard_of(post_id, SHARDS)]
+    with sqlite3.connect(owner) as conn:
+        assert conn.execute(
+            "SELECT count(*) FROM comments WHERE postId=?", (post_id,)
+        ).fetchone() == (1,)
+    for path in paths:
+        if path != owner:
+            assert post_id not in _post_ids_in(path)
@@ -0,0 +1,62 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from trending import TrendingRanking
+
+
+def _ranking(**kwargs):
+    options = dict(
+        half_life=3600.0,
+        like_weight=1.0,
+        comment_weight=2.0,
+        max_posts=100,
+        min_score=0.01,
+        interval=60.0,
+        resync_interval=5.0,
+    )
+    options.update(kwargs)
+    return TrendingRanking(**options)
+
+
+def _iso(seconds_ago):
+    at = datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)
+    return at.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def test_resync_keeps_event_time_scores_of_local_likes():
+    ranking = _ranking()
+    old, new = _iso(3 * 3600), _iso(60)
+    ranking.rebuild([("old", 0, 0, old), ("new", 20, 0, new)])
+    assert ranking.top(10)[0] == ["new"]
+
+    # 이 워커가 예전 게시물에 방금 좋아요 50개를 받았다
+    ranking.record_likes("old", 50)
+    assert ranking.top(10)[0] == ["old", "new"]
+
+    # DB 값은 이 워커의 이벤트와 같으므로 재동기화해도 순서가 뒤집히지 않는다
+    ranking.resync([("old", 50, 0, old), ("new", 20, 0, new)])
+    assert ranking.top(10)[0] == ["old", "new"]
+
+
+def test_resync_adds_other_workers_reactions_now():
+    ranking = _ranking()
+    old, new = _iso(3 * 3600), _iso(60)
+    ranking.rebuild([("old", 20, 0, old), ("new", 5, 0, new)])
+    assert ranking.top(10)[0] == ["new", "old"]
+
+    # 다른 워커가 받은 반응: 예전 게시물에 좋아요 30개, 재동기화 뒤 다른 워커가 만든 게시물
+    time.sleep(0.01)
+    fresh = _iso(0)
+    ranking.resync([("old", 50, 0, old), ("new", 5, 0, new), ("fresh", 0, 10, fresh)])
+    assert ranking.top(10)[0] == ["old", "fresh", "new"]
+
+
+def test_resync_follows_ranked_posts_and_drops_deleted_ones():
+    ranking = _ranking()
+    ranking.rebuild([("a", 3, 0, _iso(60)), ("b", 1, 0, _iso(30))])
+    ranking.record_likes("a", 2)
+
+    # 다른 워커가 b 를 삭제했다 (읽힌 행에 없음)
+    ranking.resync([("a", 5, 0, _iso(60))])
+    assert ranking.top(10)[0] == ["a"]
+    assert ranking.stats()["resyncs"] == 1
@@ -0,0 +1,278 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingRanking:
+    # 인기 게시물 순위를 메모리에 유지한다 (요청마다 posts 를 훑어 정렬하지 않음).
+    # 좋아요/댓글 이벤트는 weight * 2^((t - origin) / half_life) 를 게시물 점수에 더한다.
+    # 현재 시각의 실제 점수는 여기에 모든 게시물 공통인 2^(-(now - origin) / half_life) 를
+    # 곱한 값이므로, 시간이 지나도 순서는 그대로이고 이벤트가 있을 때만 한 항목을 옮긴다.
+    # 백그라운드 스레드가 주기적으로 origin 을 현재로 옮겨(값이 커지지 않게) 점수를 다시
+    # 계산하고, min_score 아래로 식은 게시물을 버린다.
+    # 취소(좋아요 취소/댓글 삭제)는 현재 시각 가중치로 빼므로 근사치이며 0 아래로는 내려가지 않는다.
+    #
+    # 순위는 프로세스마다 따로 있으므로, 같은 DB 를 쓰는 다른 워커의 반응은 이벤트로 들어오지
+    # 않는다. DB 가 바뀌면(mark_stale, data_version 감시) resync_interval 마다 최대 한 번
+    # 최근 게시물과 순위에 있는 게시물의 좋아요/댓글 수를 읽어, 마지막으로 본 수(+ 이 워커의
+    # 이벤트)와의 차이만 그 시각의 이벤트로 더한다. 이 워커의 이벤트는 차이가 0 이므로
+    # 이벤트 시각 기준 점수가 그대로 남고, 다른 워커의 반응은 최대 resync_interval 늦은
+    # 시각으로 들어간다. 읽기와 이 워커의 이벤트가 겹쳐 생긴 차이(두 번 더하거나 빠진 것)는
+    # 다음 재동기화에서 반대 부호의 차이로 바로잡힌다.
+
+    def __init__(
+        self,
+        half_life,
+        like_weight,
+        comment_weight,
+        max_posts,
+        min_score,
+        interval,
+        resync_interval,
+    ):
+        self.half_life = half_life
+        self.like_weight = like_weight
+        self.comment_weight = comment_weight
+        self.max_posts = max_posts
+        self.min_score = min_score
+        self.interval = interval
+        self.resync_interval = resync_interval
+        self._stale = False
+        self._lock = threading.Lock()
+        self._origin = time.time()
+        self._scores = {}
+        # 게시물 ID -> [좋아요 수, 댓글 수]: 마지막 재동기화에서 본 DB 값 + 이 워커의 이벤트
+        self._counts = {}
+        # 아직 DB 값을 모르는 게시물에 이 워커가 더한 이벤트 수 (다음 재동기화에서 기준선에 반영)
+        self._local = {}
+        self._synced_at = time.time()
+        # (-점수, 게시물 ID) 오름차순 = 점수 높은 순. 상위 k 는 앞에서 k 개를 자르면 된다
+        self._ranked = []
+        self._stop = threading.Event()
+        self._thread = None
+        self.decays = 0
+        self.pruned = 0
+        self.last_decay_ms = 0.0
+        self.rebuilds = 0
+        self.last_rebuild_ms = 0.0
+        self.resyncs = 0
+        self.last_resync_ms = 0.0
+
+    def _weight(self, at):
+        return 2 ** ((at - self._origin) / self.half_life)
+
+    def _set(self, post_id, score):
+        old = self._scores.pop(post_id, None)
+        if old is not None:
+            del self._ranked[bisect_left(self._ranked, (-old, post_id))]
+        if score <= 0:
+            return
+        self._scores[post_id] = score
+        insort(self._ranked, (-score, post_id))
+        if len(self._ranked) > self.max_posts:
+            _, dropped = self._ranked.pop()
+            del self._scores[dropped]
+
+    def record(self, post_id, weight, at=None):
+        with self._lock:
+            delta = weight * self._weight(at or time.time())
+            self._set(post_id, self._scores.get(post_id, 0.0) + delta)
+
+    def _count(self, post_id, index, n):
+        with self._lock:
+            counts = self._counts.get(post_id) or self._local.setdefault(
+                post_id, [0, 0]
+            )
+            counts[index] += n
+
+    def record_likes(self, post_id, n=1):
+        self._count(post_id, 0, n)
+        self.record(post_id, n * self.like_weight)
+
+    def record_comments(self, post_id, n=1):
+        self._count(post_id, 1, n)
+        self.record(post_id, n * self.comment_weight)
+
+    def remove(self, post_id):
+        with self._lock:
+            self._set(post_id, 0)
+            self._counts.pop(post_id, None)
+            self._local.pop(post_id, None)
+
+    def top(self, limit, offset=0):
+        # (게시물 ID 목록, 더 있는지). 잘라 내는 k 개만큼의 비용
+        with self._lock:
+            ids = [post_id for _, post_id in self._ranked[offset : offset + limit]]
+            return ids, len(self._ranked) > offset + limit
+
+    def decay(self):
+        start = time.perf_counter()
+        with self._lock:
+            now = time.time()
+            factor = 1 / self._weight(now)
+            self._origin = now
+            ranked = []
+            for neg, post_id in self._ranked:
+                score = -neg * factor
+                if score < self.min_score:
+                    # 정렬돼 있으므로 이후는 모두 기준 미만
+                    break
+                ranked.append((-score, post_id))
+            self.pruned += len(self._ranked) - len(ranked)
+            self._ranked = ranked
+            self._scores = {post_id: -neg for neg, post_id in ranked}
+            self.decays += 1
+        self.last_decay_ms = (time.perf_counter() - start) * 1000
+
+    def rebuild(self, rows):
+        # (게시물 ID, 좋아요 수, 댓글 수, createdAt) 로 순위를 통째로 새로 만든다 (시작할 때).
+        # 반응 시각을 알 수 없으므로 게시 시각에 모두 일어났다고 본다.
+        # 잠금 밖에서 정렬해 두고 바꿔 끼우므로 읽기는 거의 기다리지 않는다
+        start = time.perf_counter()
+        now = time.time()
+        ranked = []
+        for post_id, likes, comments, created_at in rows:
+            weight = likes * self.like_weight + comments * self.comment_weight
+            if weight > 0:
+                score = weight * 2 ** ((_timestamp(created_at) - now) / self.half_life)
+                if score >= self.min_score:
+                    ranked.append((-score, post_id))
+        ranked.sort()
+        del ranked[self.max_posts :]
+        with self._lock:
+            self._origin = now
+            self._ranked = ranked
+            self._scores = {post_id: -neg for neg, post_id in ranked}
+            self._counts = {row[0]: [row[1], row[2]] for row in rows}
+            self._local = {}
+            self._synced_at = now
+        self.rebuilds += 1
+        self.last_rebuild_ms = (time.perf_counter() - start) * 1000
+
+    def resync(self, rows):
+        # rows: 최근 게시물과 순위에 있는 게시물의 (ID, 좋아요 수, 댓글 수, createdAt).
+        # 마지막으로 본 수와의 차이만 지금 일어난 이벤트로 더한다 (순위를 다시 만들지 않음)
+        start = time.perf_counter()
+        now = time.time()
+        with self._lock:
+            weight = self._weight(now)
+            counts = {}
+            for post_id, likes, comments, created_at in rows:
+                known = self._counts.get(post_id)
+                if known is None:
+                    local = self._local.get(post_id, [0, 0])
+                    if _timestamp(created_at) < self._synced_at:
+                        # 처음 보는 예전 게시물: 그동안의 반응 시각을 모르므로 기준선만 잡는다
+                        counts[post_id] = [likes, comments]
+                        continue
+                    # 지난 재동기화 뒤에 생긴 게시물: 이 워커가 더한 것을 뺀 나머지가 새 반응
+                    known = local
+                delta = (likes - known[0]) * self.like_weight + (
+                    comments - known[1]
+                ) * self.comment_weight
+                if delta:
+                    score = self._scores.get(post_id, 0.0) + delta * weight
+                    self._set(post_id, score)
+                counts[post_id] = [likes, comments]
+            # 순위에 있었는데 읽히지 않은 게시물은 다른 워커가 삭제한 것
+            for post_id in [id_ for id_ in self._scores if id_ not in counts]:
+                self._set(post_id, 0)
+            self._counts = counts
+            self._local = {}
+            self._synced_at = now
+            self.resyncs += 1
+        self.last_resync_ms = (time.perf_counter() - start) * 1000
+
+    def ranked_ids(self):
+        with self._lock:
+            return list(self._scores)
+
+    def mark_stale(self):
+        # 다른 프로세스가 DB 를 바꿨을 수 있음 (감시 스레드에서 호출)
+        self._stale = True
+
+    def _load_counts(self, load_recent, load_posts):
+        # 최근 게시물 + 순위에 있는 게시물 (오래된 게시물도 순위에 있으면 계속 따라간다)
+        ids = dict.fromkeys(row[0] for row in load_recent(self.max_posts))
+        ids.update(dict.fromkeys(self.ranked_ids()))
+        return [
+            (post["id"], post["likes"], post["commentsCount"], post["createdAt"])
+            for post in load_posts(list(ids))
+        ]
+
+    def _run(self, load_recent, load_posts):
+        try:
+            self.rebuild(load_recent(self.max_posts))
+        except Exception:
+            logger.exception("trending seed failed")
+        tick = self.interval
+        if self.resync_interval > 0:
+            tick = min(tick, self.resync_interval)
+        last_decay = time.monotonic()
+        while not self._stop.wait(tick):
+            try:
+                if self._stale:
+                    self._stale = False
+                    self.resync(self._load_counts(load_recent, load_posts))
+                if time.monotonic() - last_decay >= self.interval:
+                    self.decay()
+                    last_decay = time.monotonic()
+            except Exception:
+                logger.exception("trending update failed")
+
+    def start(self, load_recent, load_posts):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(load_recent, load_posts),
+                name="sns-trending",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "posts": len(self._ranked),
+                "maxPosts": self.max_posts,
+                "halfLifeSeconds": self.half_life,
+                "decays": self.decays,
+                "pruned": self.pruned,
+                "lastDecayMs": self.last_decay_ms,
+                "rebuilds": self.rebuilds,
+                "lastRebuildMs": self.last_rebuild_ms,
+                "resyncs": self.resyncs,
+                "lastResyncMs": self.last_resync_ms,
+            }
+
+
+def _timestamp(iso):
+    return (
+        datetime.fromisoformat(iso.removesuffix("Z"))
+        .replace(tzinfo=timezone.utc)
+        .timestamp()
+    )
+
+
+trending = TrendingRanking(
+    config.TRENDING_HALF_LIFE,
+    config.TRENDING_LIKE_WEIGHT,
+    config.TRENDING_COMMENT_WEIGHT,
+    config.TRENDING_MAX_POSTS,
+    config.TRENDING_MIN_SCORE,
+    config.TRENDING_DECAY_INTERVAL,
+    config.TRENDING_RESYNC_INTERVAL,
+)
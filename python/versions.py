@@ -0,0 +1,109 @@
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+from starlette.responses import Response
+
+import config
+
+
+class Versions:
+    # ETag 용 리소스 버전. 변경 라우트가 키(게시물, 게시물의 댓글, 피드)를 bump 하면
+    # 프로세스 전역 일련번호를 새로 받아 두고, GET 은 행을 읽기 전에 이 값으로
+    # ETag 를 만들어 If-None-Match 와 비교한다.
+    # 키 수는 max_keys 로 제한하며, 밀려난 키의 값은 floor 로 남겨 버전이 절대
+    # 뒤로 가지 않게 한다(그 키들은 다음 요청에서 한 번 200 을 받을 뿐이다).
+    # boot 토큰은 재시작하거나 다른 워커가 만든 ETag 와 섞이지 않게 한다.
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.boot = os.urandom(4).hex()
+        self._seq = 0
+        self._floor = 0
+        self._versions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._versions.get(key, self._floor)
+
+    def bump(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._seq += 1
+                self._versions[key] = self._seq
+                self._versions.move_to_end(key)
+            while len(self._versions) > self.max_keys:
+                _, evicted = self._versions.popitem(last=False)
+                self._floor = max(self._floor, evicted)
+
+    def clear(self):
+        # 다른 프로세스가 DB 를 바꿨을 때 등: 모든 키의 버전을 새 값으로 올린다
+        with self._lock:
+            self._seq += 1
+            self._floor = self._seq
+            self._versions.clear()
+
+    def etag(self, *keys, query=""):
+        # 여러 키를 묶은 응답은 그중 가장 큰 버전을 쓴다. bump 는 언제나 전역 최댓값보다
+        # 큰 번호를 주므로 어느 키가 바뀌어도 ETag 가 바뀐다.
+        # query(limit/cursor/include 등)가 다르면 같은 버전이라도 본문이 다르므로 ETag 에 넣는다
+        tag = f"{self.boot}-{max(self.get(key) for key in keys)}"
+        if query:
+            tag += f"-{zlib.crc32(query.encode()):08x}"
+        return f'"{tag}"'
+
+    def stats(self):
+        with self._lock:
+            return {
+                "boot": self.boot,
+                "seq": self._seq,
+                "keys": len(self._versions),
+                "maxKeys": self.max_keys,
+            }
+
+
+versions = Versions(config.ETAG_MAX_KEYS)
+
+
+# 키: 피드(게시물 목록 전체), 모든 댓글(댓글을 임베드한 목록용), 게시물 한 건, 게시물의 댓글들
+FEED = ("feed",)
+COMMENTS = ("comments",)
+
+
+def post_key(post_id):
+    return ("post", post_id)
+
+
+def comments_key(post_id):
+    return ("comments", post_id)
+
+
+def post_created(*post_ids):
+    # 아직 없던 ID 로 묶음 조회한 응답도 다음 요청에서 바뀌도록 게시물 키도 올린다
+    versions.bump(FEED, *(post_key(post_id) for post_id in post_ids))
+
+
+def post_changed(*post_ids):
+    # 본문/좋아요 수/댓글 수가 바뀌면 그 게시물이 실린 목록 페이지도 바뀐다
+    versions.bump(*(post_key(post_id) for post_id in post_ids), FEED)
+
+
+def comments_changed(*post_ids):
+    versions.bump(*(comments_key(post_id) for post_id in post_ids), COMMENTS)
+
+
+def etag_matches(request, etag, exists=True):
+    # exists=False: 아직 리소스가 있는지 모르는 단계(DB 를 읽기 전). "*" 는 무엇이든
+    # 현재 표현이 있으면 일치하므로, 읽어서 404 가 아님을 확인한 뒤에 다시 비교한다
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return exists
+    # If-None-Match 는 약한 비교: W/ 접두어는 무시한다
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(etag):
+    return Response(status_code=304, headers={"ETag": etag})